@@ -0,0 +1,238 @@
+"""
+베이시스 파이프라인 단계별 벤치마크
+로컬 가짜 바이낸스 서버를 띄워 fetch / parse / join / sort / serialize / broadcast 단계의
+지연 시간과 메모리 할당량(tracemalloc peak)을 측정하고 JSON으로 저장
+
+    python benchmarks/bench_pipeline.py --output bench_results.json
+    python benchmarks/bench_pipeline.py --baseline bench_results.json --output new.json
+
+--baseline을 주면 단계별 중앙값을 비교해서 threshold배 이상 느려진 항목이 있으면 종료 코드 1
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INVOCATION_DIR = os.getcwd()
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # server.py가 static 디렉터리를 상대 경로로 마운트
+
+from binance_api import BinanceAPI  # noqa: E402
+from server import ConnectionManager, basis_message  # noqa: E402
+from wire_format import MSG_BASIS_UPDATE, SymbolDictionary, encode_basis_frame  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger("binance_api").setLevel(logging.WARNING)
+logging.getLogger("server").setLevel(logging.CRITICAL)
+
+def make_payloads(symbol_count: int, seed: int = 42) -> Dict[str, bytes]:
+    """심볼 수에 맞는 가짜 바이낸스 응답 본문 (모두 필터 통과하도록 생성)"""
+    rng = random.Random(seed)
+    symbols = [f"SYM{i}USDT" for i in range(symbol_count)]
+    spot = {symbol: rng.uniform(0.01, 50000) for symbol in symbols}
+    futures = {symbol: price * (1 + rng.uniform(-0.02, 0.02)) for symbol, price in spot.items()}
+    volume = {symbol: 2_000_000 / price + rng.uniform(0, 1000) for symbol, price in spot.items()}
+    bodies = {
+        "/api/v3/exchangeInfo": {"symbols": [{"symbol": s, "status": "TRADING"} for s in symbols]},
+        "/api/v3/ticker/price": [{"symbol": s, "price": f"{spot[s]:.8f}"} for s in symbols],
+        "/fapi/v1/ticker/price": [{"symbol": s, "price": f"{futures[s]:.8f}"} for s in symbols],
+        "/api/v3/ticker/24hr": [{"symbol": s, "volume": f"{volume[s]:.4f}"} for s in symbols],
+        "/fapi/v1/ticker/24hr": [{"symbol": s, "volume": f"{volume[s]:.4f}"} for s in symbols],
+        "/api/v3/ticker/bookTicker": [
+            {"symbol": s, "bidPrice": f"{spot[s] * 0.9995:.8f}", "askPrice": f"{spot[s] * 1.0005:.8f}"}
+            for s in symbols
+        ],
+        "/fapi/v1/ticker/bookTicker": [
+            {"symbol": s, "bidPrice": f"{futures[s] * 0.9995:.8f}", "askPrice": f"{futures[s] * 1.0005:.8f}"}
+            for s in symbols
+        ],
+    }
+    return {path: json.dumps(body).encode("utf-8") for path, body in bodies.items()}
+
+async def start_mock_server(payloads: Dict[str, bytes]) -> web.AppRunner:
+    """가짜 현물/선물 REST 서버 시작 (임의 포트)"""
+    async def handler(request: web.Request) -> web.Response:
+        body = payloads.get(request.path)
+        if body is None:
+            return web.Response(status=404)
+        return web.Response(body=body, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner
+
+class StubWebSocket:
+    """전송만 흉내 내는 WebSocket (브로드캐스트 팬아웃 측정용)"""
+
+    def __init__(self):
+        self.bytes_sent = 0
+
+    async def send_text(self, message: str):
+        self.bytes_sent += len(message)
+
+    async def send_bytes(self, data: bytes):
+        self.bytes_sent += len(data)
+
+async def measure(fn: Callable, repeat: int) -> Dict[str, float]:
+    """반복 실행 지연 시간(ms)과 1회 실행 시 tracemalloc peak(KB)"""
+    async def run_once():
+        result = fn()
+        if inspect.isawaitable(result):
+            await result
+
+    await run_once()  # 워밍업
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await run_once()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    await run_once()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        "min_ms": round(timings[0], 4),
+        "peak_alloc_kb": round(peak / 1024, 1),
+    }
+
+async def bench_symbols(symbol_count: int, client_counts: List[int], repeat: int) -> List[dict]:
+    """심볼 수 하나에 대해 모든 단계 측정"""
+    results = []
+    payloads = make_payloads(symbol_count)
+    runner = await start_mock_server(payloads)
+    host, port = runner.addresses[0][:2]
+    base_url = f"http://{host}:{port}"
+
+    def add(stage: str, stats: Dict[str, float], clients: int = 0):
+        results.append({"stage": stage, "symbols": symbol_count, "clients": clients, **stats})
+        print(f"{stage:<18} symbols={symbol_count:<6} clients={clients:<6} "
+              f"median={stats['median_ms']:>10.3f}ms peak={stats['peak_alloc_kb']:>10.1f}KB")
+
+    try:
+        async with BinanceAPI(spot_base_url=base_url, futures_base_url=base_url) as api:
+            async def fetch():
+                return await asyncio.gather(
+                    api.get_active_symbols(),
+                    api.get_spot_prices(),
+                    api.get_futures_prices(),
+                    api.get_spot_volumes(),
+                    api.get_futures_volumes(),
+                    api.get_spot_book(),
+                    api.get_futures_book()
+                )
+
+            # fetch: HTTP 왕복 + 파싱 포함 (get_* 메서드 그대로)
+            add("fetch", await measure(fetch, repeat))
+            # parse: 원본 본문 JSON 디코딩만
+            add("parse", await measure(lambda: [json.loads(body) for body in payloads.values()], repeat))
+
+            inputs = await fetch()
+            add("join_filter", await measure(lambda: api.compute_basis(*inputs), repeat))
+
+            basis_data = api.compute_basis(*inputs)
+            add("sort", await measure(
+                lambda: sorted(basis_data, key=lambda x: x.basis_percent, reverse=True), repeat))
+            basis_data.sort(key=lambda x: x.basis_percent, reverse=True)
+
+            add("serialize_json", await measure(
+                lambda: json.dumps(basis_message("basis_update", basis_data)), repeat))
+            add("serialize_binary", await measure(
+                lambda: encode_basis_frame(basis_data, SymbolDictionary(), MSG_BASIS_UPDATE), repeat))
+
+            for clients in client_counts:
+                for wire in ("json", "binary"):
+                    manager = ConnectionManager()
+                    manager.active_connections = [StubWebSocket() for _ in range(clients)]
+                    if wire == "binary":
+                        manager.binary_connections = {ws: None for ws in manager.active_connections}
+                    add(f"broadcast_{wire}", await measure(
+                        lambda: manager.broadcast_basis(basis_data), repeat), clients)
+    finally:
+        await runner.cleanup()
+
+    return results
+
+def compare(results: List[dict], baseline_path: str, threshold: float) -> bool:
+    """기준 결과와 비교 (느려진 항목이 없으면 True)"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    key = lambda r: (r["stage"], r["symbols"], r["clients"])
+    base = {key(r): r for r in baseline["results"]}
+
+    ok = True
+    print(f"\n📊 기준 결과 비교 ({baseline_path}, 임계값 {threshold}x)")
+    for result in results:
+        previous = base.get(key(result))
+        if previous is None or previous["median_ms"] <= 0:
+            continue
+        ratio = result["median_ms"] / previous["median_ms"]
+        mark = "❌" if ratio > threshold else "✅"
+        if ratio > threshold:
+            ok = False
+        print(f"{mark} {result['stage']:<18} symbols={result['symbols']:<6} clients={result['clients']:<6} "
+              f"{previous['median_ms']:.3f}ms → {result['median_ms']:.3f}ms ({ratio:.2f}x)")
+    return ok
+
+def parse_counts(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+async def run(args) -> List[dict]:
+    results = []
+    for symbol_count in parse_counts(args.symbols):
+        results.extend(await bench_symbols(symbol_count, parse_counts(args.clients), args.repeat))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="베이시스 파이프라인 벤치마크")
+    parser.add_argument("--symbols", default="100,1000,10000", help="심볼 수 목록 (쉼표 구분)")
+    parser.add_argument("--clients", default="1,100,1000,10000", help="WebSocket 클라이언트 수 목록")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=1.2, help="회귀로 판단할 배율")
+    args = parser.parse_args()
+    output = os.path.join(INVOCATION_DIR, args.output)
+
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 결과 저장: {output}")
+
+    if args.baseline and not compare(results, os.path.join(INVOCATION_DIR, args.baseline), args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
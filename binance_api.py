@@ -5,11 +5,26 @@
 
 import aiohttp
 import asyncio
-from typing import Dict, List, Optional
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple
 import logging
 from dataclasses import dataclass
 from datetime import datetime
 
+from metrics import (
+    BOOK_LATE,
+    COMPUTE_SECONDS,
+    FETCH_SECONDS,
+    FILTER_SYMBOLS,
+    PAYLOAD_BYTES,
+    UPSTREAM_ERRORS,
+)
+from rolling_stats import RollingBasisStats
+from tracing import span
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,113 +40,236 @@ class TickerData:
     spot_volume: float
     futures_volume: float
     last_update: datetime
+    basis_z: float = 0.0      # 롤링 윈도우 기준 베이시스% z-score
+    basis_ema: float = 0.0    # 베이시스% 지수가중 평균
+    basis_ew_std: float = 0.0  # 베이시스% 지수가중 표준편차
+    # 호가 기준 실행 가능 베이시스 (현물 매도호가에 사고 선물 매수호가에 팜, 호가 없으면 NaN)
+    spot_ask: float = math.nan
+    futures_bid: float = math.nan
+    exec_basis_percent: float = math.nan
+    # 펀딩 (premiumIndex 캐시 기준, 데이터 없으면 NaN)
+    funding_rate: float = math.nan
+    funding_annualized_percent: float = math.nan
+    mark_index_basis_percent: float = math.nan
+    next_funding_time: float = math.nan   # epoch ms
 
 class BinanceAPI:
     """바이낸스 API 클라이언트"""
     
-    def __init__(self):
-        self.spot_base_url = "https://api.binance.com"
-        self.futures_base_url = "https://fapi.binance.com"
+    def __init__(self, basis_stats: Optional[RollingBasisStats] = None, recorder=None, funding=None,
+                 books=None, spot_base_url: Optional[str] = None, futures_base_url: Optional[str] = None,
+                 coinm_base_url: Optional[str] = None):
+        # 베이스 URL은 인자 > 환경 변수 > 실제 바이낸스 순으로 결정 (replay.py 로컬 서버 연결용)
+        self.spot_base_url = spot_base_url or os.environ.get("BINANCE_SPOT_BASE_URL", "https://api.binance.com")
+        self.futures_base_url = futures_base_url or os.environ.get("BINANCE_FUTURES_BASE_URL", "https://fapi.binance.com")
+        self.coinm_base_url = coinm_base_url or os.environ.get("BINANCE_COINM_BASE_URL", "https://dapi.binance.com")
         self.session = None
+        # 원본 응답 기록기 (replay.ResponseRecorder, 없으면 기록 안 함)
+        self.recorder = recorder
+        # 틱 사이에 유지되는 펀딩 정보 캐시 (funding.FundingCache, 없으면 펀딩 컬럼 생략)
+        self.funding = funding
+        # 틱 사이에 유지되는 호가 스냅샷 캐시 (books.BookCache, 없으면 틱 안에서 호가까지 기다림)
+        self.books = books
+        # 틱 사이에 유지되는 심볼별 롤링 통계 (없으면 z-score/EMA 계산 생략)
+        self.basis_stats = basis_stats
+        # 마지막 calculate_basis가 가져온 마켓별 가격 (기간 구조 엔진이 다시 요청하지 않고 재사용)
+        self.prices: Dict[str, Dict[str, float]] = {}
+    
+    async def open(self):
+        """HTTP 세션 열기 (틱보다 오래 유지하는 캐시는 컨텍스트 매니저 대신 직접 호출)"""
+        self.session = aiohttp.ClientSession()
+    
+    async def close(self):
+        """HTTP 세션 닫기"""
+        if self.session:
+            await self.session.close()
+            self.session = None
     
     async def __aenter__(self):
         """비동기 컨텍스트 매니저 진입"""
-        self.session = aiohttp.ClientSession()
+        await self.open()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """비동기 컨텍스트 매니저 종료"""
-        if self.session:
-            await self.session.close()
+        await self.close()
+    
+    async def _read_json(self, response: aiohttp.ClientResponse, endpoint: str, started: float):
+        """응답 본문을 JSON으로 파싱 (기록기가 있으면 원본 본문도 저장)"""
+        body = await response.read()
+        FETCH_SECONDS.labels(endpoint).observe(time.perf_counter() - started)
+        PAYLOAD_BYTES.labels(endpoint).observe(len(body))
+        if self.recorder is not None:
+            await self.recorder.record(response.url.path_qs, response.status, body)
+        return json.loads(body)
+    
+    async def _record_failure(self, response: aiohttp.ClientResponse):
+        """실패 응답(4xx/5xx, 418/429 포함)도 원본 그대로 기록해서 재생 시 재현"""
+        if self.recorder is None:
+            return
+        try:
+            body = await response.read()
+        except Exception as e:
+            logger.warning(f"실패 응답 본문 읽기 오류: {e}")
+            return
+        await self.recorder.record(response.url.path_qs, response.status, body)
+    
+    async def get_json(self, base_url: str, endpoint: str):
+        """임의 엔드포인트 JSON 가져오기 (실패 시 None)"""
+        url = f"{base_url}{endpoint}"
+        
+        try:
+            started = time.perf_counter()
+            async with self.session.get(url) as response:
+                if response.status == 200:
+                    return await self._read_json(response, endpoint, started)
+                else:
+                    await self._record_failure(response)
+                    logger.error(f"{endpoint} 데이터 가져오기 실패: {response.status}")
+                    UPSTREAM_ERRORS.labels(endpoint, f"http_{response.status}").inc()
+                    return None
+        except Exception as e:
+            logger.error(f"{endpoint} API 호출 오류: {e}")
+            UPSTREAM_ERRORS.labels(endpoint, type(e).__name__).inc()
+            return None
     
     async def get_spot_prices(self) -> Dict[str, float]:
         """현물 실시간 가격 정보 가져오기"""
-        url = f"{self.spot_base_url}/api/v3/ticker/price"
+        endpoint = "/api/v3/ticker/price"
+        url = f"{self.spot_base_url}{endpoint}"
         
         try:
+            started = time.perf_counter()
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await self._read_json(response, endpoint, started)
                     return {
                         item['symbol']: float(item['price'])
                         for item in data 
                         if item['symbol'].endswith('USDT')  # USDT 페어만 필터링
                     }
                 else:
+                    await self._record_failure(response)
                     logger.error(f"현물 가격 데이터 가져오기 실패: {response.status}")
+                    UPSTREAM_ERRORS.labels(endpoint, f"http_{response.status}").inc()
                     return {}
         except Exception as e:
             logger.error(f"현물 가격 API 호출 오류: {e}")
+            UPSTREAM_ERRORS.labels(endpoint, type(e).__name__).inc()
             return {}
     
     async def get_spot_volumes(self) -> Dict[str, float]:
         """현물 거래량 정보 가져오기"""
-        url = f"{self.spot_base_url}/api/v3/ticker/24hr"
+        endpoint = "/api/v3/ticker/24hr"
+        url = f"{self.spot_base_url}{endpoint}"
         
         try:
+            started = time.perf_counter()
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await self._read_json(response, endpoint, started)
                     return {
                         item['symbol']: float(item['volume'])
                         for item in data 
                         if item['symbol'].endswith('USDT')  # USDT 페어만 필터링
                     }
                 else:
+                    await self._record_failure(response)
                     logger.error(f"현물 거래량 데이터 가져오기 실패: {response.status}")
+                    UPSTREAM_ERRORS.labels(endpoint, f"http_{response.status}").inc()
                     return {}
         except Exception as e:
             logger.error(f"현물 거래량 API 호출 오류: {e}")
+            UPSTREAM_ERRORS.labels(endpoint, type(e).__name__).inc()
             return {}
     
     async def get_futures_prices(self) -> Dict[str, float]:
         """선물 실시간 가격 정보 가져오기"""
-        url = f"{self.futures_base_url}/fapi/v1/ticker/price"
+        endpoint = "/fapi/v1/ticker/price"
+        url = f"{self.futures_base_url}{endpoint}"
         
         try:
+            started = time.perf_counter()
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await self._read_json(response, endpoint, started)
                     return {
                         item['symbol']: float(item['price'])
                         for item in data 
-                        if item['symbol'].endswith('USDT')  # USDT 페어만 필터링
+                        # USDT 무기한 + USDT 분기물(BTCUSDT_250328, 기간 구조용), 베이시스 조인은 현물 심볼과 교집합만 사용
+                        if 'USDT' in item['symbol']
                     }
                 else:
+                    await self._record_failure(response)
                     logger.error(f"선물 가격 데이터 가져오기 실패: {response.status}")
+                    UPSTREAM_ERRORS.labels(endpoint, f"http_{response.status}").inc()
                     return {}
         except Exception as e:
             logger.error(f"선물 가격 API 호출 오류: {e}")
+            UPSTREAM_ERRORS.labels(endpoint, type(e).__name__).inc()
             return {}
     
     async def get_futures_volumes(self) -> Dict[str, float]:
         """선물 거래량 정보 가져오기"""
-        url = f"{self.futures_base_url}/fapi/v1/ticker/24hr"
+        endpoint = "/fapi/v1/ticker/24hr"
+        url = f"{self.futures_base_url}{endpoint}"
         
         try:
+            started = time.perf_counter()
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await self._read_json(response, endpoint, started)
                     return {
                         item['symbol']: float(item['volume'])
                         for item in data 
                         if item['symbol'].endswith('USDT')  # USDT 페어만 필터링
                     }
                 else:
+                    await self._record_failure(response)
                     logger.error(f"선물 거래량 데이터 가져오기 실패: {response.status}")
+                    UPSTREAM_ERRORS.labels(endpoint, f"http_{response.status}").inc()
                     return {}
         except Exception as e:
             logger.error(f"선물 거래량 API 호출 오류: {e}")
+            UPSTREAM_ERRORS.labels(endpoint, type(e).__name__).inc()
             return {}
     
+    @staticmethod
+    def _parse_book(data, endpoint: str) -> Dict[str, Tuple[float, float]]:
+        """bookTicker 응답을 USDT 심볼별 (매수호가, 매도호가)로 변환 (실패/형식 오류 시 빈 호가)"""
+        if not data:
+            return {}
+        try:
+            return {
+                item['symbol']: (float(item['bidPrice']), float(item['askPrice']))
+                for item in data
+                if item['symbol'].endswith('USDT')  # USDT 페어만 필터링
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"{endpoint} 응답 형식 오류: {e}")
+            UPSTREAM_ERRORS.labels(endpoint, type(e).__name__).inc()
+            return {}
+    
+    async def get_spot_book(self) -> Dict[str, Tuple[float, float]]:
+        """현물 최우선 호가 (매수호가, 매도호가) 가져오기"""
+        endpoint = "/api/v3/ticker/bookTicker"
+        return self._parse_book(await self.get_json(self.spot_base_url, endpoint), endpoint)
+    
+    async def get_futures_book(self) -> Dict[str, Tuple[float, float]]:
+        """선물 최우선 호가 (매수호가, 매도호가) 가져오기"""
+        endpoint = "/fapi/v1/ticker/bookTicker"
+        return self._parse_book(await self.get_json(self.futures_base_url, endpoint), endpoint)
+    
     async def get_active_symbols(self) -> set:
         """활성 거래 중인 USDT 심볼 목록 가져오기"""
-        url = f"{self.spot_base_url}/api/v3/exchangeInfo"
+        endpoint = "/api/v3/exchangeInfo"
+        url = f"{self.spot_base_url}{endpoint}"
         
         try:
+            started = time.perf_counter()
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await self._read_json(response, endpoint, started)
                     # TRADING 상태이고 USDT로 끝나는 심볼만 선택
                     active_symbols = {
                         symbol['symbol'] 
@@ -141,29 +279,109 @@ class BinanceAPI:
                     logger.info(f"활성 USDT 심볼 {len(active_symbols)}개 확인")
                     return active_symbols
                 else:
+                    await self._record_failure(response)
                     logger.error(f"거래소 정보 가져오기 실패: {response.status}")
+                    UPSTREAM_ERRORS.labels(endpoint, f"http_{response.status}").inc()
                     return set()
         except Exception as e:
             logger.error(f"거래소 정보 API 호출 오류: {e}")
+            UPSTREAM_ERRORS.labels(endpoint, type(e).__name__).inc()
             return set()
 
+    async def _traced(self, name: str, coro):
+        """gather 태스크 안에서 span을 열고 코루틴 실행"""
+        with span(name):
+            return await coro
+    
+    async def _collect_funding(self, funding_task: Optional[asyncio.Task]) -> dict:
+        """펀딩 정보 결과 (캐시 요청 제한 시간까지만 기다리고, 늦거나 실패하면 캐시된 값 사용)"""
+        if funding_task is None:
+            return {}
+        done, _ = await asyncio.wait({funding_task}, timeout=self.funding.timeout)
+        if not done:
+            logger.warning("펀딩 정보 지연, 캐시된 값 사용")
+            return self.funding.rates
+        try:
+            return funding_task.result()
+        except Exception as e:
+            logger.error(f"펀딩 정보 오류, 캐시된 값 사용: {e}")
+            return self.funding.rates
+    
     async def calculate_basis(self) -> List[TickerData]:
         """현선물 베이시스 계산"""
         # 활성 심볼과 가격/거래량 데이터를 병렬로 가져오기
-        active_symbols, spot_prices, futures_prices, spot_volumes, futures_volumes = await asyncio.gather(
-            self.get_active_symbols(),
-            self.get_spot_prices(),
-            self.get_futures_prices(), 
-            self.get_spot_volumes(),
-            self.get_futures_volumes()
-        )
+        with span("fetch"):
+            # 호가는 캐시가 별도 세션에서 갱신하고, 틱은 기다리지 않고 마지막으로 완료된 스냅샷 사용
+            book_task = self.books.refresh(self) if self.books is not None else None
+            fetches = [
+                self._traced("exchangeInfo", self.get_active_symbols()),
+                self._traced("spot_price", self.get_spot_prices()),
+                self._traced("futures_price", self.get_futures_prices()),
+                self._traced("spot_24hr", self.get_spot_volumes()),
+                self._traced("futures_24hr", self.get_futures_volumes())
+            ]
+            if self.books is None:
+                # 캐시가 없으면(단독 실행) 같은 틱에서 함께 가져와 기다림
+                fetches += [
+                    self._traced("spot_book", self.get_spot_book()),
+                    self._traced("futures_book", self.get_futures_book())
+                ]
+            # 펀딩 정보는 캐시가 만료됐을 때만 실제 요청이 나감
+            funding_task = None
+            if self.funding is not None:
+                funding_task = asyncio.ensure_future(self._traced("premiumIndex", self.funding.get(self)))
+            try:
+                results = await asyncio.gather(*fetches)
+                funding_rates = await self._collect_funding(funding_task)
+            finally:
+                if funding_task is not None:
+                    funding_task.cancel()
+            active_symbols, spot_prices, futures_prices, spot_volumes, futures_volumes = results[:5]
+            self.prices = {"spot": spot_prices, "usdm": futures_prices}
+            if book_task is None:
+                spot_books, futures_books = results[5:]
+            else:
+                if not book_task.done():
+                    BOOK_LATE.inc()
+                    logger.info("호가 갱신이 아직 진행 중이라 이전 호가 스냅샷 사용")
+                spot_books, futures_books = self.books.latest()
         
+        with span("compute") as compute_span:
+            started = time.perf_counter()
+            basis_data = self.compute_basis(active_symbols, spot_prices, futures_prices,
+                                            spot_volumes, futures_volumes,
+                                            spot_books, futures_books, funding_rates)
+            
+            # 베이시스 퍼센트 기준으로 내림차순 정렬 (높은 순서)
+            basis_data.sort(key=lambda x: x.basis_percent, reverse=True)
+            COMPUTE_SECONDS.observe(time.perf_counter() - started)
+            if compute_span is not None:
+                compute_span.attrs["symbols"] = len(basis_data)
+        
+        logger.info(f"총 {len(basis_data)}개 심볼의 베이시스 계산 완료 (전체 USDT 페어 대상)")
+        return basis_data
+    
+    def compute_basis(self, active_symbols: set, spot_prices: Dict[str, float],
+                      futures_prices: Dict[str, float], spot_volumes: Dict[str, float],
+                      futures_volumes: Dict[str, float],
+                      spot_books: Optional[Dict[str, Tuple[float, float]]] = None,
+                      futures_books: Optional[Dict[str, Tuple[float, float]]] = None,
+                      funding_rates: Optional[dict] = None) -> List[TickerData]:
+        """가져온 가격/거래량/호가/펀딩을 한 번에 조인하고 필터링해서 베이시스 계산 (정렬 전)"""
         basis_data = []
+        spot_books = spot_books or {}
+        futures_books = futures_books or {}
+        funding_rates = funding_rates or {}
+        no_book = (math.nan, math.nan)
         current_time = datetime.now()
+        observed_at = time.monotonic()  # 롤링 통계의 시간 기준 윈도우용
         
         # 활성 거래 중이고 현물과 선물 모두 존재하는 심볼만 처리
         common_symbols = active_symbols & set(spot_prices.keys()) & set(futures_prices.keys())
         
+        # 필터 단계별 탈락 수 (메트릭용)
+        dropped_price = dropped_volume = dropped_range = dropped_liquidity = 0
+        
         for symbol in common_symbols:
             try:
                 spot_price = spot_prices[symbol]
@@ -173,10 +391,12 @@ class BinanceAPI:
                 
                 # 유효성 검사
                 if spot_price <= 0 or futures_price <= 0:
+                    dropped_price += 1
                     continue
                 
                 # 선물과 현물 거래량이 모두 있는지 확인 (활발한 거래 확인)
                 if spot_volume <= 0 or futures_volume <= 0:
+                    dropped_volume += 1
                     continue
                     
                 # 베이시스 계산: (선물가격 - 현물가격)
@@ -186,6 +406,7 @@ class BinanceAPI:
                 
                 # 합리적인 베이시스 범위 필터링 (-10% ~ +10%) - 더 엄격하게
                 if abs(basis_percent) > 10:
+                    dropped_range += 1
                     continue
                     
                 # 최소 거래량 필터링 - 현물과 선물 각각 최소 거래액 필요
@@ -194,8 +415,30 @@ class BinanceAPI:
                 
                 # 현물과 선물 각각 최소 50만 달러 거래액 필요
                 if spot_volume_usd < 500_000 or futures_volume_usd < 500_000:
+                    dropped_liquidity += 1
                     continue
                 
+                basis_z, basis_ema, basis_ew_std = 0.0, basis_percent, 0.0
+                if self.basis_stats is not None:
+                    basis_z, basis_ema, basis_ew_std = self.basis_stats.update(symbol, basis_percent, observed_at)
+                
+                # 실행 가능 베이시스: 현물 매도호가(ask)에 사고 선물 매수호가(bid)에 팔 때
+                spot_ask = spot_books.get(symbol, no_book)[1]
+                futures_bid = futures_books.get(symbol, no_book)[0]
+                exec_basis_percent = math.nan
+                if spot_ask > 0 and futures_bid > 0:
+                    exec_basis_percent = (futures_bid - spot_ask) / spot_ask * 100
+                
+                funding = funding_rates.get(symbol)
+                funding_columns = {}
+                if funding is not None:
+                    funding_columns = {
+                        "funding_rate": funding.funding_rate,
+                        "funding_annualized_percent": funding.annualized_percent,
+                        "mark_index_basis_percent": funding.mark_index_basis_percent,
+                        "next_funding_time": funding.next_funding_time
+                    }
+                
                 ticker_data = TickerData(
                     symbol=symbol,
                     spot_price=spot_price,
@@ -204,7 +447,14 @@ class BinanceAPI:
                     basis_percent=basis_percent,
                     spot_volume=spot_volume,
                     futures_volume=futures_volume,
-                    last_update=current_time
+                    last_update=current_time,
+                    basis_z=basis_z,
+                    basis_ema=basis_ema,
+                    basis_ew_std=basis_ew_std,
+                    spot_ask=spot_ask,
+                    futures_bid=futures_bid,
+                    exec_basis_percent=exec_basis_percent,
+                    **funding_columns
                 )
                 
                 basis_data.append(ticker_data)
@@ -213,10 +463,17 @@ class BinanceAPI:
                 logger.error(f"{symbol} 베이시스 계산 오류: {e}")
                 continue
         
-        # 베이시스 퍼센트 기준으로 내림차순 정렬 (높은 순서)
-        basis_data.sort(key=lambda x: x.basis_percent, reverse=True)
+        remaining = len(common_symbols)
+        FILTER_SYMBOLS.labels("active").set(len(active_symbols))
+        FILTER_SYMBOLS.labels("spot").set(len(spot_prices))
+        FILTER_SYMBOLS.labels("futures").set(len(futures_prices))
+        FILTER_SYMBOLS.labels("common").set(remaining)
+        for stage, dropped in (("valid_price", dropped_price), ("has_volume", dropped_volume),
+                               ("basis_range", dropped_range), ("min_liquidity", dropped_liquidity)):
+            remaining -= dropped
+            FILTER_SYMBOLS.labels(stage).set(remaining)
+        FILTER_SYMBOLS.labels("output").set(len(basis_data))
         
-        logger.info(f"총 {len(basis_data)}개 심볼의 베이시스 계산 완료 (전체 USDT 페어 대상)")
         return basis_data
     
     async def get_top_basis(self, limit: int = 5) -> List[TickerData]:
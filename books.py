@@ -0,0 +1,65 @@
+"""
+최우선 호가(bookTicker) 스냅샷 캐시
+호가 요청은 캐시가 유지하는 별도 세션에서 진행되고, 틱은 기다리지 않고 마지막으로 완료된 스냅샷을 사용
+
+- 틱이 시작될 때 갱신을 시작 (이미 진행 중이면 그 요청을 계속 사용)
+- 나머지 데이터보다 늦게 끝나면 이번 틱은 이전 스냅샷으로 계산하고, 새 스냅샷은 다음 틱부터 사용
+- max_age초보다 오래된 스냅샷은 쓰지 않음 (실행 가능 베이시스는 NaN)
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from binance_api import BinanceAPI
+from singleflight import SingleFlight
+
+Book = Dict[str, Tuple[float, float]]
+
+class BookCache:
+    """틱 사이에 유지되는 현물/선물 bookTicker 스냅샷"""
+
+    def __init__(self, max_age: float = 60.0):
+        self.max_age = max_age
+        self.spot: Book = {}
+        self.futures: Book = {}
+        self.spot_fetched_at = 0.0      # time.monotonic
+        self.futures_fetched_at = 0.0
+        self._refresh_flight: SingleFlight[None] = SingleFlight("호가 갱신")
+        self._api: Optional[BinanceAPI] = None  # 틱 세션과 별개로 유지하는 세션 (연결 재사용)
+
+    def refresh(self, api: BinanceAPI) -> asyncio.Task:
+        """호가 갱신 시작 (이미 진행 중이면 그 태스크 반환)"""
+        return self._refresh_flight.start(lambda: self._refresh(api))
+
+    async def _refresh(self, api: BinanceAPI):
+        # 틱 세션은 틱이 끝나면 닫히므로 같은 설정의 자체 세션으로 요청해서 늦게 끝나도 결과를 보관
+        if self._api is None:
+            self._api = BinanceAPI(recorder=api.recorder, spot_base_url=api.spot_base_url,
+                                   futures_base_url=api.futures_base_url, coinm_base_url=api.coinm_base_url)
+            await self._api.open()
+        book_api = self._api
+        spot, futures = await asyncio.gather(
+            book_api._traced("spot_book", book_api.get_spot_book()),
+            book_api._traced("futures_book", book_api.get_futures_book())
+        )
+        # 실패한 쪽(빈 결과)은 이전 스냅샷 유지
+        now = time.monotonic()
+        if spot:
+            self.spot, self.spot_fetched_at = spot, now
+        if futures:
+            self.futures, self.futures_fetched_at = futures, now
+
+    def latest(self) -> Tuple[Book, Book]:
+        """마지막으로 완료된 (현물, 선물) 호가 (max_age초보다 오래됐으면 빈 호가)"""
+        now = time.monotonic()
+        spot = self.spot if now - self.spot_fetched_at <= self.max_age else {}
+        futures = self.futures if now - self.futures_fetched_at <= self.max_age else {}
+        return spot, futures
+
+    async def close(self):
+        """진행 중인 갱신을 취소하고 세션 종료"""
+        self._refresh_flight.cancel()
+        if self._api is not None:
+            await self._api.close()
+            self._api = None
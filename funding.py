@@ -0,0 +1,145 @@
+"""
+무기한 선물 펀딩비 캐시
+/fapi/v1/premiumIndex(마크/인덱스 가격, 직전 펀딩비, 다음 펀딩 시각)를 일괄로 가져와
+실제로 값이 바뀌는 주기에 맞춰서만 다시 요청
+
+- 펀딩비: 펀딩 정산 시각(nextFundingTime)이 지나야 바뀌므로 그때 갱신
+- 마크/인덱스 가격: max_age초 이상 지나면 갱신 (매 틱 요청하지 않음)
+- 펀딩 주기(시간): /fapi/v1/fundingInfo는 거의 바뀌지 않으므로 interval_ttl 동안 캐시
+- 요청이 실패하거나 timeout초를 넘기면 이전 값을 유지하고 failure_backoff초 동안 다시 요청하지 않음
+"""
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from binance_api import BinanceAPI
+
+logger = logging.getLogger(__name__)
+
+# fundingInfo에 없는 심볼의 기본 펀딩 주기
+DEFAULT_FUNDING_INTERVAL_HOURS = 8
+
+# 정산 직후 바이낸스가 새 펀딩비를 반영할 때까지 여유 시간(ms)
+SETTLEMENT_GRACE_MS = 5_000
+
+@dataclass
+class FundingInfo:
+    """심볼 하나의 펀딩 정보"""
+    mark_price: float
+    index_price: float
+    funding_rate: float
+    next_funding_time: int   # epoch ms
+    interval_hours: int
+
+    @property
+    def annualized_percent(self) -> float:
+        """직전 펀딩비를 연환산한 값 (%)"""
+        return self.funding_rate * (24 / self.interval_hours) * 365 * 100
+
+    @property
+    def mark_index_basis_percent(self) -> float:
+        """마크 가격과 인덱스 가격 차이 (%)"""
+        if self.index_price <= 0:
+            return math.nan
+        return (self.mark_price - self.index_price) / self.index_price * 100
+
+class FundingCache:
+    """틱 사이에 유지되는 premiumIndex 캐시"""
+
+    def __init__(self, max_age: float = 60.0, interval_ttl: float = 3600.0,
+                 timeout: float = 2.0, failure_backoff: float = 30.0):
+        self.max_age = max_age
+        self.interval_ttl = interval_ttl
+        self.timeout = timeout                  # 갱신 요청 최대 시간(초)
+        self.failure_backoff = failure_backoff  # 실패 후 재요청까지 대기(초)
+        self.rates: Dict[str, FundingInfo] = {}
+        self.fetched_at = 0.0          # time.monotonic
+        self.next_refresh_ms = 0       # 가장 이른 다음 펀딩 정산 시각 (epoch ms)
+        self.retry_at = 0.0            # 실패 후 다음 요청 가능 시각 (time.monotonic)
+        self.intervals: Dict[str, int] = {}
+        self.intervals_fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def is_stale(self) -> bool:
+        return (not self.rates
+                or time.monotonic() - self.fetched_at > self.max_age
+                or time.time() * 1000 >= self.next_refresh_ms)
+
+    def should_refresh(self) -> bool:
+        """오래됐고 실패 대기 중이 아닐 때만 요청"""
+        return self.is_stale() and time.monotonic() >= self.retry_at
+
+    async def _load_intervals(self, api: BinanceAPI) -> Dict[str, int]:
+        """심볼별 펀딩 주기 (기본 주기와 다른 심볼만 응답에 포함됨)"""
+        if self.intervals_fetched_at and time.monotonic() - self.intervals_fetched_at < self.interval_ttl:
+            return self.intervals
+        data = await api.get_json(api.futures_base_url, "/fapi/v1/fundingInfo")
+        if data is not None:
+            self.intervals = {
+                item["symbol"]: int(item["fundingIntervalHours"])
+                for item in data
+                if item.get("fundingIntervalHours")
+            }
+            self.intervals_fetched_at = time.monotonic()
+        return self.intervals
+
+    async def _fetch(self, api: BinanceAPI) -> Optional[Dict[str, FundingInfo]]:
+        """premiumIndex 요청 후 파싱 (실패 시 None)"""
+        data, intervals = await asyncio.gather(
+            api.get_json(api.futures_base_url, "/fapi/v1/premiumIndex"),
+            self._load_intervals(api)
+        )
+        if not data:
+            return None
+
+        rates = {}
+        for item in data:
+            symbol = item["symbol"]
+            if not symbol.endswith("USDT") or not item.get("nextFundingTime"):
+                continue  # USDT 무기한만 (분기물은 nextFundingTime이 0)
+            rates[symbol] = FundingInfo(
+                mark_price=float(item["markPrice"]),
+                index_price=float(item["indexPrice"]),
+                funding_rate=float(item["lastFundingRate"] or 0),
+                next_funding_time=int(item["nextFundingTime"]),
+                interval_hours=intervals.get(symbol, DEFAULT_FUNDING_INTERVAL_HOURS)
+            )
+        return rates or None
+
+    async def get(self, api: BinanceAPI) -> Dict[str, FundingInfo]:
+        """펀딩 정보 (캐시가 유효하거나 실패 대기 중이면 요청 없이 반환)"""
+        if not self.should_refresh():
+            return self.rates
+
+        async with self._lock:
+            # 대기하는 동안 다른 틱이 이미 갱신했을 수 있음
+            if not self.should_refresh():
+                return self.rates
+
+            try:
+                rates = await asyncio.wait_for(self._fetch(api), self.timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"펀딩 정보 요청 시간({self.timeout}s) 초과")
+                rates = None
+            except Exception as e:
+                logger.error(f"펀딩 정보 처리 오류: {e}")
+                rates = None
+
+            if rates is None:
+                # 실패 시 이전 값 유지, 장애 중에 틱마다 요청하지 않도록 잠시 대기
+                self.retry_at = time.monotonic() + self.failure_backoff
+                return self.rates
+
+            self.rates = rates
+            self.fetched_at = time.monotonic()
+            # 정산 시각이 이미 지난 행(상장폐지/정산 중)은 제외, 앞으로 정산이 없으면 max_age 기준으로만 갱신
+            now_ms = time.time() * 1000
+            upcoming = [info.next_funding_time for info in rates.values() if info.next_funding_time > now_ms]
+            self.next_refresh_ms = (min(upcoming) + SETTLEMENT_GRACE_MS if upcoming
+                                    else now_ms + self.max_age * 1000)
+            logger.info(f"펀딩 정보 갱신: {len(rates)}개 심볼")
+            return rates
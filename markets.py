@@ -0,0 +1,279 @@
+"""
+마켓 어댑터와 기간 구조(term structure) 베이시스 엔진
+현물 / USD-M(fapi) / COIN-M(dapi) 각 마켓이 자기 마감 시간 안에서 병렬로 가져오고,
+기초자산(base asset) 기준으로 조인해서 계약별 베이시스와 만기 기준 연환산 베이시스를 계산
+
+새 마켓은 MarketAdapter를 상속해 fetch()만 구현하면 엔진에 붙일 수 있음
+베이시스 틱이 이미 가져온 가격(현물, USD-M)은 마켓 이름으로 넘겨받아 다시 요청하지 않음
+"""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from binance_api import BinanceAPI
+from metrics import MARKET_FAILURES, MARKET_FETCH_SECONDS
+from singleflight import SingleFlight
+from tracing import TickTracer, span
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ContractQuote:
+    """마켓 하나의 계약 시세"""
+    market: str
+    symbol: str
+    base_asset: str
+    contract_type: str                # SPOT / PERPETUAL / CURRENT_QUARTER / NEXT_QUARTER ...
+    price: float
+    expiry: Optional[datetime] = None  # 무기한/현물은 None
+
+@dataclass
+class TermBasis:
+    """계약별 베이시스 (기간 구조 한 점)"""
+    base_asset: str
+    market: str
+    symbol: str
+    contract_type: str
+    spot_price: float
+    futures_price: float
+    basis_percent: float
+    expiry: Optional[datetime]
+    days_to_expiry: Optional[float]
+    annualized_percent: Optional[float]  # 만기 없는 무기한은 None
+
+class MarketAdapter(ABC):
+    """마켓 어댑터 기본 클래스"""
+
+    name = ""
+
+    def __init__(self, deadline: float = 3.0):
+        self.deadline = deadline  # 이 시간 안에 못 가져오면 이번 틱에서 제외
+
+    @abstractmethod
+    async def fetch(self, api: BinanceAPI, prices: Optional[Dict[str, float]] = None) -> List[ContractQuote]:
+        """계약 시세 가져오기 (prices: 같은 틱에 이미 가져온 심볼별 가격, 있으면 가격 요청 생략)"""
+
+class SpotMarket(MarketAdapter):
+    """현물 USDT 페어 (기간 구조의 기준 가격)"""
+
+    name = "spot"
+
+    async def fetch(self, api: BinanceAPI, prices: Optional[Dict[str, float]] = None) -> List[ContractQuote]:
+        spot_prices = prices if prices is not None else await api.get_spot_prices()
+        return [
+            ContractQuote(self.name, symbol, symbol[:-len("USDT")], "SPOT", price)
+            for symbol, price in spot_prices.items()
+            if price > 0
+        ]
+
+class DeliveryMarket(MarketAdapter):
+    """exchangeInfo + ticker/price 구조의 선물 마켓 공통 구현
+
+    계약 메타데이터(기초자산, 계약 종류, 만기)는 거의 바뀌지 않으므로 metadata_ttl 동안 캐시
+    """
+
+    base_url_attr = ""
+    info_endpoint = ""
+    price_endpoint = ""
+    quote_assets: Tuple[str, ...] = ()
+
+    def __init__(self, deadline: float = 3.0, metadata_ttl: float = 3600.0):
+        super().__init__(deadline)
+        self.metadata_ttl = metadata_ttl
+        self._contracts: Dict[str, Tuple[str, str, Optional[datetime]]] = {}
+        self._contracts_loaded_at = 0.0
+
+    async def _load_contracts(self, api: BinanceAPI) -> Dict[str, Tuple[str, str, Optional[datetime]]]:
+        """심볼 → (기초자산, 계약 종류, 만기) (캐시가 만료됐을 때만 새로 요청)"""
+        if self._contracts and time.monotonic() - self._contracts_loaded_at < self.metadata_ttl:
+            return self._contracts
+
+        data = await api.get_json(getattr(api, self.base_url_attr), self.info_endpoint)
+        if not data:
+            return self._contracts  # 실패 시 이전 캐시 사용
+
+        contracts = {}
+        for item in data.get("symbols", []):
+            status = item.get("status") or item.get("contractStatus")
+            contract_type = item.get("contractType")
+            if status != "TRADING" or not contract_type or item.get("quoteAsset") not in self.quote_assets:
+                continue
+            expiry = None
+            if contract_type != "PERPETUAL":
+                expiry = datetime.fromtimestamp(item["deliveryDate"] / 1000, tz=timezone.utc)
+            contracts[item["symbol"]] = (item["baseAsset"], contract_type, expiry)
+
+        self._contracts = contracts
+        self._contracts_loaded_at = time.monotonic()
+        return contracts
+
+    async def fetch(self, api: BinanceAPI, prices: Optional[Dict[str, float]] = None) -> List[ContractQuote]:
+        if prices is None:
+            contracts, data = await asyncio.gather(
+                self._load_contracts(api),
+                api.get_json(getattr(api, self.base_url_attr), self.price_endpoint)
+            )
+            prices = {item["symbol"]: float(item["price"]) for item in data or []}
+        else:
+            contracts = await self._load_contracts(api)
+        quotes = []
+        for symbol, price in prices.items():
+            contract = contracts.get(symbol)
+            if contract is None or price <= 0:
+                continue
+            base_asset, contract_type, expiry = contract
+            quotes.append(ContractQuote(self.name, symbol, base_asset, contract_type, price, expiry))
+        return quotes
+
+class UsdmMarket(DeliveryMarket):
+    """USD-M 선물 (USDT 무기한 + 분기물)"""
+
+    name = "usdm"
+    base_url_attr = "futures_base_url"
+    info_endpoint = "/fapi/v1/exchangeInfo"
+    price_endpoint = "/fapi/v1/ticker/price"
+    quote_assets = ("USDT",)
+
+class CoinmMarket(DeliveryMarket):
+    """COIN-M 선물 (USD 표시 무기한 + 분기물, USDT 현물과 USD≈USDT로 비교)"""
+
+    name = "coinm"
+    base_url_attr = "coinm_base_url"
+    info_endpoint = "/dapi/v1/exchangeInfo"
+    price_endpoint = "/dapi/v1/ticker/price"
+    quote_assets = ("USD",)
+
+class TermStructureEngine:
+    """마켓 어댑터들을 병렬로 실행하고 기초자산 기준으로 조인하는 엔진"""
+
+    def __init__(self, spot: MarketAdapter, markets: List[MarketAdapter]):
+        self.spot = spot
+        self.markets = markets
+
+    async def _fetch_market(self, adapter: MarketAdapter, api: BinanceAPI,
+                            prices: Optional[Dict[str, float]] = None) -> List[ContractQuote]:
+        """마켓 하나를 마감 시간 안에서 가져오기 (느리거나 실패하면 빈 목록)"""
+        started = time.perf_counter()
+        with span(f"market:{adapter.name}") as market_span:
+            try:
+                quotes = await asyncio.wait_for(adapter.fetch(api, prices), adapter.deadline)
+            except asyncio.TimeoutError:
+                logger.warning(f"{adapter.name} 마켓 마감 시간({adapter.deadline}s) 초과, 이번 틱에서 제외")
+                MARKET_FAILURES.labels(adapter.name, "timeout").inc()
+                quotes = []
+            except Exception as e:
+                logger.error(f"{adapter.name} 마켓 가져오기 오류: {e}")
+                MARKET_FAILURES.labels(adapter.name, type(e).__name__).inc()
+                quotes = []
+            if market_span is not None:
+                market_span.attrs["contracts"] = len(quotes)
+        MARKET_FETCH_SECONDS.labels(adapter.name).observe(time.perf_counter() - started)
+        return quotes
+
+    async def snapshot(self, api: BinanceAPI,
+                       prices: Optional[Dict[str, Dict[str, float]]] = None) -> List[TermBasis]:
+        """모든 마켓을 병렬로 가져와 기간 구조 계산 (prices: 마켓 이름 → 이미 가져온 심볼별 가격)"""
+        prices = prices or {}
+        spot_quotes, *market_quotes = await asyncio.gather(
+            self._fetch_market(self.spot, api, prices.get(self.spot.name)),
+            *(self._fetch_market(market, api, prices.get(market.name)) for market in self.markets)
+        )
+        return self.join(spot_quotes, [quote for quotes in market_quotes for quote in quotes])
+
+    def join(self, spot_quotes: List[ContractQuote], quotes: List[ContractQuote],
+             now: Optional[datetime] = None) -> List[TermBasis]:
+        """기초자산 기준 조인 + 만기 기준 연환산 (단리: 베이시스% × 365 / 잔존일수)"""
+        now = now or datetime.now(timezone.utc)
+        spot_by_base = {quote.base_asset: quote.price for quote in spot_quotes}
+
+        term_basis = []
+        for quote in quotes:
+            spot_price = spot_by_base.get(quote.base_asset)
+            if spot_price is None:
+                continue
+            basis_percent = (quote.price - spot_price) / spot_price * 100
+
+            days_to_expiry = annualized_percent = None
+            if quote.expiry is not None:
+                days_to_expiry = (quote.expiry - now).total_seconds() / 86400
+                if days_to_expiry <= 0:
+                    continue  # 만기 지난 계약
+                annualized_percent = basis_percent * 365 / days_to_expiry
+
+            term_basis.append(TermBasis(
+                base_asset=quote.base_asset,
+                market=quote.market,
+                symbol=quote.symbol,
+                contract_type=quote.contract_type,
+                spot_price=spot_price,
+                futures_price=quote.price,
+                basis_percent=basis_percent,
+                expiry=quote.expiry,
+                days_to_expiry=days_to_expiry,
+                annualized_percent=annualized_percent
+            ))
+
+        # 기초자산별로 무기한 → 가까운 만기 순서
+        term_basis.sort(key=lambda t: (t.base_asset, t.expiry is not None, t.expiry or now, t.market))
+        return term_basis
+
+def default_engine() -> TermStructureEngine:
+    """현물 기준 USD-M + COIN-M 기간 구조 엔진"""
+    return TermStructureEngine(SpotMarket(), [UsdmMarket(), CoinmMarket()])
+
+class TermStructureFeed:
+    """마지막 기간 구조 스냅샷 (베이시스 틱이 넘겨준 가격으로 틱과 별도 태스크에서 갱신)
+
+    최근 idle_timeout초 안에 요청이 있었을 때만 틱마다 갱신해서, 아무도 보지 않으면 dapi 요청을 하지 않음
+    """
+
+    def __init__(self, engine: TermStructureEngine, api_factory: Callable[[], BinanceAPI],
+                 idle_timeout: float = 120.0, tracer: Optional[TickTracer] = None):
+        self.engine = engine
+        self.api_factory = api_factory  # 틱 세션은 틱이 끝나면 닫히므로 갱신마다 자체 세션 사용
+        self.idle_timeout = idle_timeout
+        self.tracer = tracer
+        self.snapshot: Optional[List[TermBasis]] = None
+        self.snapshot_at: Optional[float] = None       # time.monotonic
+        self.snapshot_time: Optional[datetime] = None  # 계산 시각
+        self.requested_at: Optional[float] = None
+        self._refresh_flight: SingleFlight[List[TermBasis]] = SingleFlight("기간 구조 갱신")
+
+    def request(self):
+        """기간 구조 수요 기록"""
+        self.requested_at = time.monotonic()
+
+    def wanted(self) -> bool:
+        return self.requested_at is not None and time.monotonic() - self.requested_at < self.idle_timeout
+
+    def snapshot_age(self) -> Optional[float]:
+        if self.snapshot_at is None:
+            return None
+        return time.monotonic() - self.snapshot_at
+
+    def refresh(self, prices: Optional[Dict[str, Dict[str, float]]] = None) -> asyncio.Task:
+        """갱신 시작 (이미 진행 중이면 그 태스크 반환, 기다리지 않아도 됨)"""
+        return self._refresh_flight.start(lambda: self._refresh(prices))
+
+    async def _refresh(self, prices: Optional[Dict[str, Dict[str, float]]]) -> List[TermBasis]:
+        # 베이시스 틱과 분리된 별도 트레이스로 기록
+        trace = self.tracer.tick("term_structure") if self.tracer is not None else nullcontext()
+        with trace:
+            async with self.api_factory() as api:
+                snapshot = await self.engine.snapshot(api, prices)
+        self.snapshot = snapshot
+        self.snapshot_at = time.monotonic()
+        self.snapshot_time = datetime.now()
+        return snapshot
+
+    async def get_snapshot(self, max_age: float) -> Tuple[List[TermBasis], bool]:
+        """(스냅샷, stale 여부) 반환 (아직 스냅샷이 없으면 한 번 계산해서 기다림)"""
+        if self.snapshot is None:
+            await asyncio.shield(self.refresh())
+        return self.snapshot, self.snapshot_age() >= max_age
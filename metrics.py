@@ -0,0 +1,204 @@
+"""
+Prometheus 텍스트 포맷 메트릭
+외부 의존성 없는 경량 Counter / Gauge / Histogram 구현과 핫패스 계측 지표 정의
+
+모든 갱신은 이벤트 루프 스레드에서 단순 덧셈/대입으로만 이루어지므로 락이 필요 없음
+"""
+
+import bisect
+import math
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(8))  # 1KB ~ 16MB
+
+REGISTRY: List["_Metric"] = []
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+class _Metric(ABC):
+    """라벨별 자식 값을 가지는 메트릭 공통 부분"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self.labels()  # 라벨 없는 메트릭은 첫 갱신 전에도 0으로 노출
+        REGISTRY.append(self)
+
+    @abstractmethod
+    def _new_child(self):
+        """라벨 조합 하나의 값 객체 생성"""
+
+    def labels(self, *values: str):
+        """라벨 값에 해당하는 자식 메트릭 (처음 접근 시 생성)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: 라벨 {self.labelnames} 필요, {values} 받음")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.extend(child.render(self.name, _format_labels(self.labelnames, values)))
+        return lines
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def render(self, name: str, labels: str) -> List[str]:
+        return [f"{name}{labels} {_format_value(self.value)}"]
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]):
+        """스크레이프 시점에 값을 계산하는 함수 등록"""
+        self.function = function
+
+    def render(self, name: str, labels: str) -> List[str]:
+        value = self.function() if self.function is not None else self.value
+        return [f"{name}{labels} {_format_value(value)}"]
+
+class Gauge(_Metric):
+    """임의 값 게이지"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self.labels().set_function(function)
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        # 버킷별 개수만 기록하고 누적은 렌더링 시 계산
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> List[str]:
+        lines = []
+        prefix = labels[:-1] + "," if labels else "{"
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{prefix}le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f'{name}_bucket{prefix}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{labels} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{labels} {self.count}")
+        return lines
+
+class Histogram(_Metric):
+    """고정 버킷 히스토그램"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+def render_metrics() -> str:
+    """등록된 모든 메트릭을 Prometheus 텍스트 포맷으로 출력"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# 바이낸스 업스트림
+FETCH_SECONDS = Histogram("binance_fetch_seconds", "바이낸스 엔드포인트 요청~본문 수신 시간", ["endpoint"])
+PAYLOAD_BYTES = Histogram("binance_payload_bytes", "바이낸스 응답 본문 크기", ["endpoint"], buckets=SIZE_BUCKETS)
+UPSTREAM_ERRORS = Counter("binance_upstream_errors_total", "바이낸스 요청 실패 횟수", ["endpoint", "reason"])
+
+# 베이시스 계산
+COMPUTE_SECONDS = Histogram("basis_compute_seconds", "조인/필터/정렬 소요 시간")
+BOOK_LATE = Counter("basis_book_late_total", "호가 갱신이 틱 데이터보다 늦어 이전 호가 스냅샷을 쓴 횟수")
+FILTER_SYMBOLS = Gauge("basis_filter_symbols", "마지막 계산의 필터 단계별 남은 심볼 수", ["stage"])
+SNAPSHOT_AGE = Gauge("basis_snapshot_age_seconds", "마지막 스냅샷 경과 시간")
+TICK_INTERVAL = Gauge("scheduler_tick_interval_seconds", "현재 유효 틱 주기 (중단 시 NaN)")
+
+# 기간 구조 (마켓 어댑터)
+MARKET_FETCH_SECONDS = Histogram("term_market_fetch_seconds", "마켓 어댑터별 가져오기 시간", ["market"])
+MARKET_FAILURES = Counter("term_market_failures_total", "마감 시간 초과/오류로 제외된 마켓 수", ["market", "reason"])
+
+# 직렬화 / 팬아웃
+SERIALIZE_SECONDS = Histogram("basis_serialize_seconds", "스냅샷 직렬화 시간", ["format"])
+BROADCAST_SECONDS = Histogram("basis_broadcast_seconds", "전체 클라이언트 브로드캐스트 시간")
+ACTIVE_CONNECTIONS = Gauge("ws_active_connections", "활성 WebSocket 연결 수", ["format"])
+BROADCAST_QUEUE_DEPTH = Gauge("ws_broadcast_queue_depth", "현재 브로드캐스트에서 아직 전송하지 않은 클라이언트 수")
+DROPPED_FRAMES = Counter("ws_dropped_frames_total", "전송 실패로 버려진 WebSocket 프레임 수")
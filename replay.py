@@ -0,0 +1,217 @@
+"""
+바이낸스 원본 응답 기록/재생 도구
+실제 API 응답을 압축 아카이브로 저장하고, 로컬 가짜 현물/선물 서버로 재생
+
+    # 기록: 10초마다 서버 틱과 같은 요청(베이시스, 펀딩, 기간 구조)을 실행하며 모든 응답 저장
+    python replay.py record archive.jsonl.gz --interval 10 --duration 600
+
+    # 재생: 1배속 / N배속 / 최대 속도(max)로 로컬 서버 실행
+    python replay.py serve archive.jsonl.gz --speed 4 --port 9000
+
+    # 재생 서버에 연결해서 모니터 서버 실행
+    BINANCE_SPOT_BASE_URL=http://127.0.0.1:9000 \\
+    BINANCE_FUTURES_BASE_URL=http://127.0.0.1:9000 \\
+    BINANCE_COINM_BASE_URL=http://127.0.0.1:9000 python server.py
+
+아카이브는 gzip 멤버를 이어 붙인 JSON Lines 파일이며,
+한 줄이 응답 하나: {"t": 수신 시각(epoch 초), "path": 경로+쿼리, "status": 상태 코드, "body": 원본 본문}
+실패 응답(418/429/5xx 등)도 상태 코드와 본문 그대로 기록되어 재생됨
+"""
+
+import argparse
+import asyncio
+import bisect
+import gzip
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web, WSMsgType
+
+from binance_api import BinanceAPI
+from funding import FundingCache
+from markets import default_engine
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ResponseRecorder:
+    """원본 응답을 gzip JSON Lines 아카이브에 추가 기록"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _append(self, line: bytes):
+        # 레코드마다 gzip 멤버를 새로 추가해서 중간에 종료돼도 아카이브가 깨지지 않음
+        with self._lock:
+            with gzip.open(self.path, "ab") as f:
+                f.write(line)
+
+    async def record(self, path: str, status: int, body: bytes):
+        """응답 하나 기록 (압축은 스레드에서 처리해 이벤트 루프를 막지 않음)"""
+        entry = {
+            "t": time.time(),
+            "path": path,
+            "status": status,
+            "body": body.decode("utf-8", errors="replace"),
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        await asyncio.to_thread(self._append, line)
+        self.count += 1
+
+def load_archive(path: str) -> Dict[str, List[Tuple[float, int, str]]]:
+    """아카이브를 경로별 (시각, 상태 코드, 본문) 목록으로 로드"""
+    responses: Dict[str, List[Tuple[float, int, str]]] = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            responses.setdefault(entry["path"], []).append(
+                (entry["t"], entry["status"], entry["body"])
+            )
+    for entries in responses.values():
+        entries.sort(key=lambda entry: entry[0])
+    return responses
+
+class ReplayServer:
+    """기록된 응답을 재생하는 로컬 가짜 현물/선물 HTTP + WebSocket 서버
+
+    speed=None이면 최대 속도: 요청마다 해당 경로의 다음 응답을 순서대로 반환.
+    그 외에는 아카이브 시계를 speed배로 진행시키며 그 시점의 최신 응답을 반환.
+    """
+
+    def __init__(self, archive_path: str, speed: Optional[float] = 1.0, loop: bool = True):
+        self.responses = load_archive(archive_path)
+        self.times = {path: [entry[0] for entry in entries] for path, entries in self.responses.items()}
+        all_times = [t for times in self.times.values() for t in times]
+        if not all_times:
+            raise ValueError(f"빈 아카이브: {archive_path}")
+        self.start_time = min(all_times)
+        self.duration = max(all_times) - self.start_time
+        self.speed = speed
+        self.loop = loop
+        self.cursors: Dict[str, int] = {}
+        self.started_at = time.monotonic()
+        self.request_count = 0
+
+    def archive_now(self) -> float:
+        """현재 재생 시점 (아카이브 기준 epoch 초)"""
+        elapsed = (time.monotonic() - self.started_at) * self.speed
+        if self.loop and self.duration > 0:
+            elapsed %= self.duration
+        return self.start_time + elapsed
+
+    def next_response(self, path: str) -> Optional[Tuple[float, int, str]]:
+        """경로에 대해 지금 돌려줄 응답 선택"""
+        entries = self.responses.get(path)
+        if not entries:
+            return None
+        if self.speed is None:
+            index = self.cursors.get(path, 0)
+            if index >= len(entries):
+                if not self.loop:
+                    return entries[-1]
+                index = 0
+            self.cursors[path] = index + 1
+            return entries[index]
+        index = bisect.bisect_right(self.times[path], self.archive_now()) - 1
+        return entries[max(index, 0)]
+
+    async def handle_http(self, request: web.Request) -> web.Response:
+        """REST 엔드포인트 재생 (/api/v3/..., /fapi/v1/... 등 기록된 모든 경로)"""
+        self.request_count += 1
+        response = self.next_response(request.path_qs)
+        if response is None:
+            return web.json_response({"code": -1, "msg": f"기록 없음: {request.path_qs}"}, status=404)
+        _, status, body = response
+        return web.Response(text=body, status=status, content_type="application/json")
+
+    async def handle_stream(self, request: web.Request) -> web.WebSocketResponse:
+        """WebSocket 재생: /stream?path=<REST 경로>의 기록을 기록 당시 간격(speed배)으로 푸시"""
+        path = request.query.get("path", "")
+        entries = self.responses.get(path)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        if not entries:
+            await ws.close(message=f"기록 없음: {path}".encode("utf-8"))
+            return ws
+
+        sender = asyncio.create_task(self._stream_entries(ws, entries))
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.ERROR:
+                    break
+        finally:
+            sender.cancel()
+        return ws
+
+    async def _stream_entries(self, ws: web.WebSocketResponse, entries: List[Tuple[float, int, str]]):
+        while not ws.closed:
+            previous = entries[0][0]
+            for t, _, body in entries:
+                if self.speed is not None and t > previous:
+                    await asyncio.sleep((t - previous) / self.speed)
+                previous = t
+                await ws.send_str(body)
+                if self.speed is None:
+                    await asyncio.sleep(0)
+            if not self.loop:
+                break
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/stream", self.handle_stream)
+        app.router.add_get("/{tail:.*}", self.handle_http)
+        return app
+
+async def record(archive_path: str, interval: float, duration: float):
+    """실제 바이낸스에서 서버 틱과 같은 요청을 반복 실행하며 응답 기록
+
+    펀딩 캐시와 기간 구조 엔진도 서버처럼 틱 사이에 유지해서
+    premiumIndex / fundingInfo / fapi·dapi exchangeInfo 등도 서버가 요청하는 주기대로 기록
+    """
+    recorder = ResponseRecorder(archive_path)
+    funding = FundingCache()
+    term_engine = default_engine()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        async with BinanceAPI(recorder=recorder, funding=funding) as api:
+            all_basis = await api.calculate_basis()
+            term_structure = await term_engine.snapshot(api, api.prices)
+        logger.info(f"기록 완료: 누적 응답 {recorder.count}개, 베이시스 {len(all_basis)}개, "
+                    f"기간 구조 {len(term_structure)}개")
+        await asyncio.sleep(interval)
+
+def main():
+    parser = argparse.ArgumentParser(description="바이낸스 응답 기록/재생")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="실제 API 응답 기록")
+    record_parser.add_argument("archive")
+    record_parser.add_argument("--interval", type=float, default=10.0, help="틱 간격(초)")
+    record_parser.add_argument("--duration", type=float, default=600.0, help="기록 시간(초)")
+
+    serve_parser = subparsers.add_parser("serve", help="기록된 응답 재생 서버 실행")
+    serve_parser.add_argument("archive")
+    serve_parser.add_argument("--speed", default="1", help="재생 배속 (숫자 또는 max)")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=9000)
+    serve_parser.add_argument("--no-loop", action="store_true", help="끝에 도달하면 마지막 응답 유지")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        asyncio.run(record(args.archive, args.interval, args.duration))
+    else:
+        speed = None if args.speed == "max" else float(args.speed)
+        server = ReplayServer(args.archive, speed=speed, loop=not args.no_loop)
+        logger.info(f"재생 서버 시작: {len(server.responses)}개 경로, 배속 {args.speed}, 포트 {args.port}")
+        web.run_app(server.make_app(), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
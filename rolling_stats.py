@@ -0,0 +1,101 @@
+"""
+심볼별 베이시스% 롤링 통계
+틱마다 O(1)로 롤링 윈도우 평균/분산(Welford 방식)과 지수가중 평균/분산을 갱신
+
+틱 주기는 구독자에 따라 2~60초로 바뀌므로 윈도우는 틱 수가 아닌 시간 기준:
+sample_interval초마다 한 슬롯을 채우고(틱이 슬롯보다 느리면 빈 슬롯은 직전 값으로 채움),
+EMA는 경과 시간에 비례해 가중하므로 어떤 틱 주기에서도 윈도우는 window × sample_interval초
+
+가장 느린 틱 주기(max_gap초)보다 오래 비어 있었으면 (소비자가 없어 스케줄러가 중단된 경우 등)
+그 사이 값을 지어내지 않고 윈도우를 새로 시작 (한 번에 채우는 슬롯은 max_gap / sample_interval개 정도로 제한)
+"""
+
+import math
+import time
+from array import array
+from typing import Dict, Optional, Tuple
+
+class _SymbolWindow:
+    """심볼 하나의 롤링 윈도우 상태 (미리 할당된 링 버퍼)"""
+
+    __slots__ = ("values", "pos", "count", "mean", "m2", "ema", "ew_var", "last_value", "sampled_at", "updated_at")
+
+    def __init__(self, window: int, value: float, now: float):
+        self.values = array("d", bytes(8 * window))
+        self.pos = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ema = value
+        self.ew_var = 0.0
+        self.last_value = value
+        self.sampled_at = now   # 마지막으로 채운 슬롯 시각
+        self.updated_at = now   # 마지막 EMA 갱신 시각
+
+class RollingBasisStats:
+    """심볼별 베이시스% 롤링 통계 (윈도우 길이와 무관하게 슬롯당 O(1))"""
+
+    def __init__(self, window: int = 360, ema_span: int = 60, sample_interval: float = 10.0,
+                 max_gap: float = 60.0):
+        # 기본값: 10초 슬롯 기준 롤링 1시간, EMA 약 10분, 최대 틱 주기 60초
+        self.window = window
+        self.alpha = 2.0 / (ema_span + 1)   # sample_interval초당 가중치
+        self.sample_interval = sample_interval
+        self.max_gap = max_gap
+        self._symbols: Dict[str, _SymbolWindow] = {}
+
+    def _push(self, state: _SymbolWindow, value: float):
+        """윈도우에 슬롯 하나 추가"""
+        if state.count < self.window:
+            # 윈도우가 찰 때까지는 일반 Welford 누적
+            state.count += 1
+            delta = value - state.mean
+            state.mean += delta / state.count
+            state.m2 += delta * (value - state.mean)
+        else:
+            # 가장 오래된 값을 새 값으로 교체하는 슬라이딩 Welford
+            old = state.values[state.pos]
+            old_mean = state.mean
+            state.mean += (value - old) / self.window
+            state.m2 += (value - old) * (value - state.mean + old - old_mean)
+            if state.m2 < 0:
+                state.m2 = 0.0  # 부동소수점 오차 보정
+
+        state.values[state.pos] = value
+        state.pos = (state.pos + 1) % self.window
+
+    def update(self, symbol: str, value: float, now: Optional[float] = None) -> Tuple[float, float, float]:
+        """새 관측값 반영 후 (z-score, EMA, 지수가중 표준편차) 반환 (now: time.monotonic 기준 관측 시각)"""
+        now = time.monotonic() if now is None else now
+        state = self._symbols.get(symbol)
+
+        # 틱 지연을 감안해 한 슬롯만큼 여유
+        if state is None or now - state.updated_at > self.max_gap + self.sample_interval:
+            # 처음이거나 최대 틱 주기보다 오래 관측이 끊겼으면 새로 시작
+            state = self._symbols[symbol] = _SymbolWindow(self.window, value, now)
+            self._push(state, value)
+        else:
+            slots = int((now - state.sampled_at) // self.sample_interval)
+            if slots > 0:
+                # 틱 사이의 빈 슬롯은 직전 값이 유지된 것으로 보고 채움
+                for _ in range(slots - 1):
+                    self._push(state, state.last_value)
+                self._push(state, value)
+                state.sampled_at += slots * self.sample_interval
+
+            # 경과 시간에 비례한 지수가중 평균/분산 (같은 가중치로 증분 갱신)
+            weight = 1 - (1 - self.alpha) ** ((now - state.updated_at) / self.sample_interval)
+            delta = value - state.ema
+            state.ema += weight * delta
+            state.ew_var = (1 - weight) * (state.ew_var + weight * delta * delta)
+            state.updated_at = now
+
+        state.last_value = value
+
+        z_score = 0.0
+        if state.count > 1:
+            stdev = math.sqrt(state.m2 / (state.count - 1))
+            if stdev > 0:
+                z_score = (value - state.mean) / stdev
+
+        return z_score, state.ema, math.sqrt(state.ew_var)
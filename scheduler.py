@@ -0,0 +1,115 @@
+"""
+수요 기반 갱신 스케줄러
+WebSocket 구독자가 원하는 주기에 맞춰 틱 속도를 조절하고, 소비자가 없으면 틱을 멈춤
+REST 호출에는 stale-while-revalidate로 마지막 스냅샷을 즉시 반환하고 필요하면 뒤에서 갱신
+
+- WebSocket 연결이 있으면: 연결별 요청 주기 중 최솟값
+- REST 호출만 있으면: rest_idle_timeout초 동안 rest_interval 주기로 틱
+- 아무도 없으면: 다음 연결/요청이 올 때까지 중단
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class RefreshScheduler(Generic[T]):
+    """틱 실행을 한 곳에서 관리하는 스케줄러 (동시에 하나의 갱신만 실행)"""
+
+    def __init__(self, tick: Callable[[], Awaitable[T]], ws_interval: Callable[[], Optional[float]],
+                 rest_interval: float = 30.0, rest_idle_timeout: float = 120.0, error_backoff: float = 5.0):
+        self.tick = tick                  # 스냅샷 계산 + 브로드캐스트
+        self.ws_interval = ws_interval    # WebSocket 구독자가 원하는 주기 (연결 없으면 None)
+        self.rest_interval = rest_interval
+        self.rest_idle_timeout = rest_idle_timeout
+        self.error_backoff = error_backoff
+
+        self.snapshot: Optional[T] = None
+        self.snapshot_at: Optional[float] = None  # time.monotonic
+        self.current_interval: Optional[float] = None
+        self.last_rest_at: Optional[float] = None
+        self._refresh_flight: SingleFlight[T] = SingleFlight("스냅샷 갱신")
+        self._wake = asyncio.Event()
+
+    def effective_interval(self) -> Optional[float]:
+        """현재 수요 기준 틱 주기 (None이면 중단)"""
+        interval = self.ws_interval()
+        if interval is not None:
+            return interval
+        if self.last_rest_at is not None and time.monotonic() - self.last_rest_at < self.rest_idle_timeout:
+            return self.rest_interval
+        return None
+
+    def snapshot_age(self) -> Optional[float]:
+        if self.snapshot_at is None:
+            return None
+        return time.monotonic() - self.snapshot_at
+
+    def notify(self):
+        """수요 변화 알림 (연결/구독 변경, 중단 상태에서의 REST 호출)"""
+        self._wake.set()
+
+    async def _do_refresh(self) -> T:
+        snapshot = await self.tick()
+        self.snapshot = snapshot
+        self.snapshot_at = time.monotonic()
+        return snapshot
+
+    def _start_refresh(self) -> asyncio.Task:
+        return self._refresh_flight.start(self._do_refresh)
+
+    async def refresh(self) -> T:
+        """스냅샷 갱신 (이미 진행 중이면 그 결과를 함께 기다림)"""
+        # 기다리던 요청이 취소돼도 공유 중인 갱신은 계속 진행
+        return await asyncio.shield(self._start_refresh())
+
+    async def get_snapshot(self, rest: bool = True):
+        """(스냅샷, stale 여부) 반환: 스냅샷이 오래됐으면 그대로 주고 뒤에서 갱신"""
+        if rest:
+            suspended = self.effective_interval() is None
+            self.last_rest_at = time.monotonic()
+            if suspended:
+                self.notify()
+
+        if self.snapshot is None:
+            return await self.refresh(), False
+
+        interval = self.effective_interval() or self.rest_interval
+        stale = self.snapshot_age() >= interval
+        if stale:
+            self._start_refresh()
+        return self.snapshot, stale
+
+    async def run(self):
+        """백그라운드 틱 루프"""
+        while True:
+            self._wake.clear()
+            interval = self.effective_interval()
+            self.current_interval = interval
+
+            if interval is None:
+                logger.info("소비자가 없어 틱 중단")
+                await self._wake.wait()
+                continue
+
+            age = self.snapshot_age()
+            if age is None or age >= interval:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.error(f"데이터 브로드캐스트 오류: {e}")
+                    await asyncio.sleep(self.error_backoff)  # 오류 시 잠시 대기
+                    continue
+                age = 0.0
+
+            # 다음 틱까지 대기 (수요가 바뀌면 즉시 다시 계산)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(interval - age, 0.0))
+            except asyncio.TimeoutError:
+                pass
@@ -3,18 +3,44 @@
 WebSocket을 통한 실시간 데이터 전송
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 import asyncio
+import heapq
 import json
 import logging
+import math
 import os
-from typing import List
+import time
+from typing import Dict, List, Optional
 from datetime import datetime
 import uvicorn
 
 from binance_api import BinanceAPI, TickerData
+from books import BookCache
+from funding import FundingCache
+from markets import TermBasis, TermStructureFeed, default_engine
+from metrics import (
+    ACTIVE_CONNECTIONS,
+    BROADCAST_QUEUE_DEPTH,
+    BROADCAST_SECONDS,
+    DROPPED_FRAMES,
+    SERIALIZE_SECONDS,
+    SNAPSHOT_AGE,
+    TICK_INTERVAL,
+    render_metrics,
+)
+from replay import ResponseRecorder
+from rolling_stats import RollingBasisStats
+from scheduler import RefreshScheduler
+from tracing import TickTracer, span
+from wire_format import (
+    MSG_BASIS_UPDATE,
+    MSG_INITIAL_DATA,
+    SymbolDictionary,
+    encode_basis_frame,
+)
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -25,29 +51,107 @@ app = FastAPI(title="바이낸스 현선물 베이시스 모니터", version="1.
 # 정적 파일 서빙 (HTML, CSS, JS)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# /debug/* 엔드포인트 노출 여부 (클라이언트 진단 정보가 있으므로 기본 비활성)
+DEBUG_ENDPOINTS = os.environ.get("DEBUG_ENDPOINTS", "").lower() in ("1", "true", "yes")
+
+# 틱 주기(초): 기본값과 클라이언트가 subscribe 메시지로 요청할 수 있는 범위
+DEFAULT_TICK_INTERVAL = float(os.environ.get("TICK_INTERVAL", 10))
+MIN_TICK_INTERVAL = float(os.environ.get("MIN_TICK_INTERVAL", 2))
+MAX_TICK_INTERVAL = 60.0
+
 class ConnectionManager:
     """WebSocket 연결 관리자"""
     
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        # 바이너리 포맷 연결 → 마지막으로 보낸 심볼 사전 버전 (None: 아직 전송 안 함)
+        self.binary_connections: Dict[WebSocket, Optional[int]] = {}
+        self.symbol_dictionary = SymbolDictionary()
+        # 연결별 요청 업데이트 주기(초), 없으면 기본 주기
+        self.update_intervals: Dict[WebSocket, float] = {}
+        # 트레이스용 불투명 연결 ID (클라이언트 주소를 노출하지 않음)
+        self.connection_ids: Dict[WebSocket, int] = {}
+        self._next_connection_id = 0
     
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, binary: bool = False):
         await websocket.accept()
         self.active_connections.append(websocket)
-        logger.info(f"새 연결: 총 {len(self.active_connections)}개 연결")
+        self._next_connection_id += 1
+        self.connection_ids[websocket] = self._next_connection_id
+        if binary:
+            self.binary_connections[websocket] = None
+        logger.info(f"새 연결: 총 {len(self.active_connections)}개 연결 (바이너리 {len(self.binary_connections)}개)")
     
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+            self.binary_connections.pop(websocket, None)
+            self.update_intervals.pop(websocket, None)
+            self.connection_ids.pop(websocket, None)
             logger.info(f"연결 끊김: 총 {len(self.active_connections)}개 연결")
     
+    def connection_label(self, websocket: WebSocket) -> str:
+        """트레이스용 연결 식별자"""
+        return f"conn-{self.connection_ids.get(websocket, 0)}"
+    
+    def set_format(self, websocket: WebSocket, wire_format: str):
+        """연결별 전송 포맷 변경 (json / binary)"""
+        if wire_format == "binary":
+            self.binary_connections.setdefault(websocket, None)
+        else:
+            self.binary_connections.pop(websocket, None)
+        logger.info(f"전송 포맷 변경: {wire_format}")
+    
+    def set_interval(self, websocket: WebSocket, interval: float):
+        """연결별 업데이트 주기 변경 (MIN_TICK_INTERVAL ~ MAX_TICK_INTERVAL로 제한)"""
+        self.update_intervals[websocket] = min(max(interval, MIN_TICK_INTERVAL), MAX_TICK_INTERVAL)
+    
+    def reset_interval(self, websocket: WebSocket):
+        """연결별 요청 주기 해제 (서버 기본 주기로 복귀)"""
+        self.update_intervals.pop(websocket, None)
+    
+    def desired_interval(self) -> Optional[float]:
+        """연결된 클라이언트들이 원하는 가장 짧은 주기 (연결 없으면 None)"""
+        if not self.active_connections:
+            return None
+        return min(self.update_intervals.get(websocket, DEFAULT_TICK_INTERVAL)
+                   for websocket in self.active_connections)
+    
     async def send_personal_message(self, message: str, websocket: WebSocket):
         try:
             await websocket.send_text(message)
         except Exception as e:
             logger.error(f"개별 메시지 전송 실패: {e}")
+            DROPPED_FRAMES.inc()
             self.disconnect(websocket)
     
+    async def send_binary_frame(self, frame: bytes, dict_frame: bytes, dict_version: int,
+                                websocket: WebSocket):
+        """바이너리 프레임 전송 (심볼 사전이 바뀌었으면 사전을 먼저 전송)"""
+        if self.binary_connections.get(websocket) != dict_version:
+            await websocket.send_bytes(dict_frame)
+            self.binary_connections[websocket] = dict_version
+        await websocket.send_bytes(frame)
+    
+    def encode_binary(self, all_basis: List[TickerData], msg_type: int, stale: bool = False):
+        """바이너리 프레임과 그 시점의 심볼 사전 (프레임, 사전 프레임, 사전 버전)"""
+        started = time.perf_counter()
+        frame = encode_basis_frame(all_basis, self.symbol_dictionary, msg_type, stale)
+        SERIALIZE_SECONDS.labels("binary").observe(time.perf_counter() - started)
+        return frame, self.symbol_dictionary.encode(), self.symbol_dictionary.version
+    
+    async def send_basis(self, all_basis: List[TickerData], websocket: WebSocket, stale: bool = False):
+        """연결 포맷에 맞춰 초기 베이시스 데이터 전송 (stale: 오래된 스냅샷, 새 스냅샷은 곧 브로드캐스트됨)"""
+        if websocket in self.binary_connections:
+            try:
+                await self.send_binary_frame(*self.encode_binary(all_basis, MSG_INITIAL_DATA, stale), websocket)
+            except Exception as e:
+                logger.error(f"개별 메시지 전송 실패: {e}")
+                DROPPED_FRAMES.inc()
+                self.disconnect(websocket)
+        else:
+            await self.send_personal_message(json.dumps(basis_message("initial_data", all_basis, stale)), websocket)
+    
     async def broadcast(self, message: str):
         """모든 연결된 클라이언트에게 메시지 브로드캐스트"""
         disconnected = []
@@ -57,14 +161,109 @@ class ConnectionManager:
                 await connection.send_text(message)
             except Exception as e:
                 logger.error(f"브로드캐스트 실패: {e}")
+                DROPPED_FRAMES.inc()
                 disconnected.append(connection)
         
         # 끊어진 연결 제거
         for connection in disconnected:
             self.disconnect(connection)
+    
+    async def broadcast_basis(self, all_basis: List[TickerData]):
+        """베이시스 스냅샷 브로드캐스트 (포맷별로 한 번씩만 인코딩)"""
+        started = time.perf_counter()
+        disconnected = []
+        text_message = None
+        binary = None
+        connections = list(self.active_connections)
+        BROADCAST_QUEUE_DEPTH.set(len(connections))
+        
+        with span("broadcast", clients=len(connections)) as broadcast_span:
+            send_times = []
+            
+            for connection in connections:
+                send_started = time.perf_counter()
+                try:
+                    if connection in self.binary_connections:
+                        if binary is None:
+                            with span("serialize_binary"):
+                                binary = self.encode_binary(all_basis, MSG_BASIS_UPDATE)
+                        await self.send_binary_frame(*binary, connection)
+                    else:
+                        if text_message is None:
+                            with span("serialize_json"):
+                                serialize_started = time.perf_counter()
+                                text_message = json.dumps(basis_message("basis_update", all_basis))
+                                SERIALIZE_SECONDS.labels("json").observe(time.perf_counter() - serialize_started)
+                        await connection.send_text(text_message)
+                except Exception as e:
+                    logger.error(f"브로드캐스트 실패: {e}")
+                    DROPPED_FRAMES.inc()
+                    disconnected.append(connection)
+                BROADCAST_QUEUE_DEPTH.dec()
+                if broadcast_span is not None:
+                    send_times.append((time.perf_counter() - send_started, id(connection), connection))
+            
+            if broadcast_span is not None:
+                # 가장 느린 클라이언트 기록 (느린 소비자 진단용)
+                broadcast_span.attrs["slowest_clients"] = [
+                    {"client": self.connection_label(connection), "ms": round(elapsed * 1000, 3)}
+                    for elapsed, _, connection in heapq.nlargest(5, send_times)
+                ]
+        
+        # 끊어진 연결 제거
+        for connection in disconnected:
+            self.disconnect(connection)
+        
+        BROADCAST_SECONDS.observe(time.perf_counter() - started)
 
 manager = ConnectionManager()
 
+# 스크레이프 시점에 계산되는 게이지
+ACTIVE_CONNECTIONS.labels("json").set_function(
+    lambda: len(manager.active_connections) - len(manager.binary_connections))
+ACTIVE_CONNECTIONS.labels("binary").set_function(lambda: len(manager.binary_connections))
+
+# 심볼별 베이시스% 롤링 통계 (브로드캐스트 틱만 샘플을 추가)
+basis_stats = RollingBasisStats(max_gap=MAX_TICK_INTERVAL)
+
+# BINANCE_RECORD_PATH 설정 시 모든 바이낸스 원본 응답을 아카이브에 기록 (replay.py로 재생)
+record_path = os.environ.get("BINANCE_RECORD_PATH")
+recorder = ResponseRecorder(record_path) if record_path else None
+
+# 틱 트레이스 (최근 TICK_TRACE_BUFFER개 보관, TICK_SLOW_MS 초과 시 경고 로그,
+# TICK_PROFILE_INTERVAL_MS 설정 시 틱 동안 스택 샘플링)
+tracer = TickTracer(
+    capacity=int(os.environ.get("TICK_TRACE_BUFFER", 100)),
+    slow_threshold=float(os.environ.get("TICK_SLOW_MS", 5000)) / 1000,
+    profile_interval=float(os.environ.get("TICK_PROFILE_INTERVAL_MS", 0)) / 1000
+)
+
+# premiumIndex 캐시 (펀딩 정산 시각 또는 FUNDING_MAX_AGE초가 지나야 다시 요청)
+funding_cache = FundingCache(max_age=float(os.environ.get("FUNDING_MAX_AGE", 60)))
+
+# 호가 스냅샷 캐시 (틱과 별도로 갱신되고 틱은 마지막 완료 스냅샷을 사용)
+book_cache = BookCache()
+
+def new_api(stats: Optional[RollingBasisStats] = None) -> BinanceAPI:
+    """공유 상태(기록기, 펀딩 캐시, 호가 캐시)를 연결한 바이낸스 API 클라이언트
+
+    롤링 통계는 run_tick에서만 넘김 (REST 호출이나 연결마다 샘플이 추가되면 z-score가 왜곡됨)
+    """
+    return BinanceAPI(stats, recorder=recorder, funding=funding_cache, books=book_cache)
+
+# 현물 / USD-M / COIN-M 기간 구조 (마켓별 계약 메타데이터 캐시 유지, /api/term-structure 요청이
+# REST_IDLE_TIMEOUT초 안에 있었을 때만 틱이 가져온 현물/USD-M 가격으로 별도 태스크에서 갱신)
+term_feed = TermStructureFeed(
+    default_engine(),
+    new_api,
+    idle_timeout=float(os.environ.get("REST_IDLE_TIMEOUT", 120)),
+    tracer=tracer
+)
+
+def round_or_none(value: float, digits: int) -> Optional[float]:
+    """NaN(데이터 없음)은 JSON null로 변환"""
+    return None if math.isnan(value) else round(value, digits)
+
 def ticker_to_dict(ticker: TickerData) -> dict:
     """TickerData를 딕셔너리로 변환"""
     return {
@@ -75,39 +274,93 @@ def ticker_to_dict(ticker: TickerData) -> dict:
         "basis_percent": round(ticker.basis_percent, 2),
         "spot_volume": round(ticker.spot_volume, 2),
         "futures_volume": round(ticker.futures_volume, 2),
-        "last_update": ticker.last_update.isoformat()
+        "last_update": ticker.last_update.isoformat(),
+        "basis_z": round(ticker.basis_z, 2),
+        "basis_ema": round(ticker.basis_ema, 4),
+        "basis_ew_std": round(ticker.basis_ew_std, 4),
+        "spot_ask": round_or_none(ticker.spot_ask, 4),
+        "futures_bid": round_or_none(ticker.futures_bid, 4),
+        "exec_basis_percent": round_or_none(ticker.exec_basis_percent, 2),
+        "funding_rate": round_or_none(ticker.funding_rate, 6),
+        "funding_annualized_percent": round_or_none(ticker.funding_annualized_percent, 2),
+        "mark_index_basis_percent": round_or_none(ticker.mark_index_basis_percent, 4),
+        "next_funding_time": None if math.isnan(ticker.next_funding_time) else int(ticker.next_funding_time)
     }
 
-async def data_broadcaster():
-    """백그라운드에서 실행되는 데이터 브로드캐스터"""
-    while True:
-        try:
-            if manager.active_connections:
-                async with BinanceAPI() as api:
-                    all_basis = await api.get_all_basis_data()
-                    
-                    data = {
-                        "type": "basis_update",
-                        "timestamp": datetime.now().isoformat(),
-                        "data": [ticker_to_dict(ticker) for ticker in all_basis],
-                        "total_count": len(all_basis)
-                    }
-                    
-                    await manager.broadcast(json.dumps(data))
-                    logger.info(f"브로드캐스트 완료: 전체 {len(all_basis)}개 베이시스 데이터")
+def term_basis_to_dict(term: TermBasis) -> dict:
+    """TermBasis를 딕셔너리로 변환"""
+    return {
+        "base_asset": term.base_asset,
+        "market": term.market,
+        "symbol": term.symbol,
+        "contract_type": term.contract_type,
+        "spot_price": round(term.spot_price, 4),
+        "futures_price": round(term.futures_price, 4),
+        "basis_percent": round(term.basis_percent, 4),
+        "expiry": term.expiry.isoformat() if term.expiry else None,
+        "days_to_expiry": round(term.days_to_expiry, 2) if term.days_to_expiry is not None else None,
+        "annualized_percent": round(term.annualized_percent, 2) if term.annualized_percent is not None else None
+    }
+
+def term_structure_message(term_structure: List[TermBasis], computed_at: datetime) -> dict:
+    """기간 구조 JSON 메시지 구성"""
+    return {
+        "type": "term_structure",
+        "timestamp": computed_at.isoformat(),
+        "data": [term_basis_to_dict(term) for term in term_structure],
+        "total_count": len(term_structure)
+    }
+
+def snapshot_time(all_basis: List[TickerData]) -> datetime:
+    """스냅샷 계산 시각 (한 스냅샷의 행은 모두 같은 last_update를 가짐)"""
+    return all_basis[0].last_update if all_basis else datetime.now()
+
+def basis_message(message_type: str, all_basis: List[TickerData], stale: bool = False) -> dict:
+    """베이시스 스냅샷 JSON 메시지 구성 (timestamp는 전송 시각이 아닌 스냅샷 계산 시각)"""
+    return {
+        "type": message_type,
+        "timestamp": snapshot_time(all_basis).isoformat(),
+        "stale": stale,
+        "data": [ticker_to_dict(ticker) for ticker in all_basis],
+        "total_count": len(all_basis)
+    }
+
+async def run_tick() -> List[TickerData]:
+    """틱 한 번: 베이시스 스냅샷 계산 후 WebSocket 클라이언트에 브로드캐스트"""
+    with tracer.tick("tick", connections=len(manager.active_connections)):
+        async with new_api(basis_stats) as api:
+            all_basis = await api.get_all_basis_data()
             
-            # 10초마다 업데이트
-            await asyncio.sleep(10)
+            # 기간 구조는 이번 틱 가격으로 별도 태스크에서 갱신 (기다리지 않으므로 느린 마켓이 틱을 막지 않음)
+            if term_feed.wanted():
+                term_feed.refresh(api.prices)
             
-        except Exception as e:
-            logger.error(f"데이터 브로드캐스트 오류: {e}")
-            await asyncio.sleep(5)  # 오류 시 5초 대기
+            if manager.active_connections:
+                await manager.broadcast_basis(all_basis)
+    logger.info(f"브로드캐스트 완료: 전체 {len(all_basis)}개 베이시스 데이터")
+    return all_basis
+
+# 수요 기반 스케줄러 (WebSocket 구독 주기에 맞춰 틱, 소비자가 없으면 중단, REST는 stale-while-revalidate)
+scheduler = RefreshScheduler(
+    run_tick,
+    manager.desired_interval,
+    rest_interval=float(os.environ.get("REST_TICK_INTERVAL", 30)),
+    rest_idle_timeout=float(os.environ.get("REST_IDLE_TIMEOUT", 120))
+)
+
+SNAPSHOT_AGE.set_function(lambda: scheduler.snapshot_age() if scheduler.snapshot_at else float("nan"))
+TICK_INTERVAL.set_function(lambda: scheduler.current_interval or float("nan"))
 
 @app.on_event("startup")
 async def startup_event():
     """서버 시작 시 백그라운드 작업 시작"""
     logger.info("🚀 바이낸스 베이시스 모니터 서버 시작")
-    asyncio.create_task(data_broadcaster())
+    asyncio.create_task(scheduler.run())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """서버 종료 시 틱 밖에서 유지하는 세션 정리"""
+    await book_cache.close()
 
 @app.get("/", response_class=HTMLResponse)
 async def get_index():
@@ -119,14 +372,39 @@ async def get_index():
 async def get_basis():
     """REST API: 현재 베이시스 데이터"""
     try:
-        async with BinanceAPI() as api:
-            all_basis = await api.get_all_basis_data()
-            return {
-                "success": True,
-                "timestamp": datetime.now().isoformat(),
-                "data": [ticker_to_dict(ticker) for ticker in all_basis],
-                "total_count": len(all_basis)
-            }
+        # 마지막 스냅샷을 바로 반환하고, 오래됐으면 뒤에서 갱신 (stale-while-revalidate)
+        all_basis, stale = await scheduler.get_snapshot()
+        return {
+            "success": True,
+            "timestamp": datetime.now().isoformat(),
+            "data": [ticker_to_dict(ticker) for ticker in all_basis],
+            "total_count": len(all_basis),
+            "stale": stale,
+            "snapshot_age": round(scheduler.snapshot_age(), 3)
+        }
+    except Exception as e:
+        logger.error(f"REST API 오류: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
+@app.get("/api/term-structure")
+async def get_term_structure():
+    """REST API: 현물 대비 USD-M / COIN-M 계약별 베이시스 (만기 기준 연환산 포함)"""
+    try:
+        # 기간 구조는 베이시스 틱과 함께 갱신되므로 REST 수요를 스케줄러에 알리고 마지막 스냅샷 반환
+        term_feed.request()
+        await scheduler.get_snapshot()
+        term_structure, stale = await term_feed.get_snapshot(
+            scheduler.effective_interval() or scheduler.rest_interval)
+        return {
+            "success": True,
+            **term_structure_message(term_structure, term_feed.snapshot_time),
+            "stale": stale,
+            "snapshot_age": round(term_feed.snapshot_age(), 3)
+        }
     except Exception as e:
         logger.error(f"REST API 오류: {e}")
         return {
@@ -136,31 +414,50 @@ async def get_basis():
         }
 
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket 엔드포인트"""
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, format: str = "json"):
+    """WebSocket 엔드포인트
+
+    ?format=binary 쿼리 또는 {"type": "set_format", "format": "binary"} 메시지로
+    컴팩트 바이너리 프레임(wire_format.py)을 선택할 수 있음
+    {"type": "subscribe", "interval": 초} 메시지로 원하는 업데이트 주기를 요청하고
+    {"type": "unsubscribe"} 메시지로 기본 주기(TICK_INTERVAL)로 되돌릴 수 있음
+    """
+    await manager.connect(websocket, binary=(format == "binary"))
+    scheduler.notify()
     
     try:
-        # 연결 즉시 현재 데이터 전송
-        async with BinanceAPI() as api:
-            all_basis = await api.get_all_basis_data()
-            initial_data = {
-                "type": "initial_data",
-                "timestamp": datetime.now().isoformat(),
-                "data": [ticker_to_dict(ticker) for ticker in all_basis],
-                "total_count": len(all_basis)
-            }
-            await manager.send_personal_message(json.dumps(initial_data), websocket)
+        # 연결 즉시 현재 스냅샷 전송 (없으면 새로 계산)
+        # 스케줄러가 중단돼 있었다면 오래된 스냅샷을 stale로 표시해서 보내고 새 스냅샷은 갱신 후 브로드캐스트
+        all_basis, stale = await scheduler.get_snapshot(rest=False)
+        await manager.send_basis(all_basis, websocket, stale)
         
         # 연결 유지
         while True:
-            await websocket.receive_text()  # 클라이언트 메시지 대기
+            message = await websocket.receive_text()  # 클라이언트 메시지 대기
+            try:
+                request = json.loads(message)
+            except ValueError:
+                continue
+            if not isinstance(request, dict):
+                continue
+            if request.get("type") == "set_format":
+                manager.set_format(websocket, request.get("format", "json"))
+            elif request.get("type") == "subscribe":
+                try:
+                    manager.set_interval(websocket, float(request.get("interval", DEFAULT_TICK_INTERVAL)))
+                except (TypeError, ValueError):
+                    continue
+                scheduler.notify()
+            elif request.get("type") == "unsubscribe":
+                manager.reset_interval(websocket)
+                scheduler.notify()
             
     except WebSocketDisconnect:
         manager.disconnect(websocket)
     except Exception as e:
         logger.error(f"WebSocket 오류: {e}")
         manager.disconnect(websocket)
+    scheduler.notify()
 
 @app.get("/health")
 async def health_check():
@@ -168,9 +465,28 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "active_connections": len(manager.active_connections)
+        "active_connections": len(manager.active_connections),
+        "scheduler": "active" if scheduler.current_interval else "suspended",
+        "tick_interval": scheduler.current_interval,
+        "snapshot_age": round(scheduler.snapshot_age(), 3) if scheduler.snapshot_at else None
     }
 
+@app.get("/debug/ticks")
+async def get_debug_ticks(limit: Optional[int] = Query(None, ge=0)):
+    """최근 틱의 span 트리 (최신순, DEBUG_ENDPOINTS 설정 시에만 노출)"""
+    if not DEBUG_ENDPOINTS:
+        raise HTTPException(status_code=404)
+    return {
+        "capacity": tracer.ticks.maxlen,
+        "slow_threshold_ms": tracer.slow_threshold * 1000,
+        "ticks": tracer.recent(limit)
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus 메트릭"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
     logger.info(f"서버 시작... 포트: {port}")
@@ -0,0 +1,34 @@
+"""
+단일 실행 백그라운드 작업
+이미 진행 중인 작업이 있으면 새로 시작하지 않고 그 태스크를 함께 사용 (호가/기간 구조/스냅샷 갱신 공통)
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class SingleFlight(Generic[T]):
+    """동시에 하나만 실행되는 작업 (실패는 기다리는 쪽이 없어도 로그로 남김)"""
+
+    def __init__(self, description: str):
+        self.description = description  # 오류 로그용 작업 이름
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self, factory: Callable[[], Awaitable[T]]) -> asyncio.Task:
+        """작업 시작 (이미 진행 중이면 그 태스크 반환, factory는 새로 시작할 때만 호출)"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(factory())
+            self.task.add_done_callback(self._log_failure)
+        return self.task
+
+    def cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    def _log_failure(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"{self.description} 오류: {task.exception()}")
@@ -11,14 +11,30 @@ class BasisMonitor {
         this.maxReconnectAttempts = 5;
         this.reconnectDelay = 3000;
         
+        // 전송 포맷: ?format=binary 로 컴팩트 바이너리 프레임 사용
+        this.wireFormat = new URLSearchParams(window.location.search).get('format') === 'binary' ? 'binary' : 'json';
+        // 업데이트 주기(초): ?interval=2 처럼 요청하면 서버 틱이 그에 맞춰 빨라짐
+        this.updateInterval = parseFloat(new URLSearchParams(window.location.search).get('interval')) || null;
+        this.hiddenInterval = 60;     // 탭이 숨겨져 있을 때 요청할 주기
+        this.symbolDict = [];         // 바이너리 포맷 심볼 사전
+        this.symbolDictVersion = null;
+        
         // 정렬 상태
-        this.currentData = [];
         this.sortColumn = 'basis_percent';  // 기본 정렬: 베이시스 %
         this.sortDirection = 'desc';        // 기본: 내림차순
         
         // 데이터 관리
         this.allData = [];  // 전체 데이터
-        this.displayLimit = 10;  // 표시할 개수
+        
+        // 가상 스크롤 테이블: 보이는 행만 DOM에 두고 바뀐 셀만 갱신
+        this.rowsBySymbol = new Map();  // 심볼 → 최신 데이터
+        this.sortValues = new Map();    // 심볼 → 현재 정렬 기준 값
+        this.sortedSymbols = [];        // 정렬 순서 (메시지마다 이전 순서를 보정)
+        this.rowPool = [];              // 재사용하는 행 (셀 참조 + 마지막 표시 값)
+        this.rowHeight = 0;             // 첫 렌더링 때 측정
+        this.overscan = 6;              // 화면 위아래로 미리 그려둘 행 수
+        this.renderScheduled = false;
+        this.numberFormats = {};        // 소수 자릿수별 Intl.NumberFormat 캐시
         
         // DOM 요소 참조
         this.elements = {
@@ -27,10 +43,12 @@ class BasisMonitor {
             refreshIcon: document.getElementById('refreshIcon'),
             basisTableBody: document.getElementById('basisTableBody'),
             basisTable: document.getElementById('basisTable'),
+            tableWrapper: document.getElementById('basisTable').closest('.table-wrapper'),
             maxBasis: document.getElementById('maxBasis'),
             maxBasisSymbol: document.getElementById('maxBasisSymbol'),
             avgBasis: document.getElementById('avgBasis'),
             totalVolume: document.getElementById('totalVolume'),
+            rankingScope: document.getElementById('rankingScope'),
             toast: document.getElementById('toast'),
             toastMessage: document.getElementById('toastMessage')
         };
@@ -52,6 +70,11 @@ class BasisMonitor {
             }
         });
         
+        // 탭이 숨겨지면 느린 업데이트를 요청하고, 다시 보이면 원래 주기로 복귀
+        document.addEventListener('visibilitychange', () => {
+            this.sendSubscription();
+        });
+        
         // 포커스 복귀 시 연결 상태 확인
         window.addEventListener('focus', () => {
             if (!this.isConnected) {
@@ -62,7 +85,13 @@ class BasisMonitor {
         // 테이블 헤더 클릭 이벤트 (정렬)
         this.setupTableSorting();
         
-
+        // 스크롤/크기 변경 시 보이는 구간만 다시 그림
+        this.elements.tableWrapper.classList.add('virtual-scroll');
+        this.elements.tableWrapper.addEventListener('scroll', () => this.scheduleRender(), { passive: true });
+        window.addEventListener('resize', () => {
+            this.rowHeight = 0;  // 반응형 스타일로 행 높이가 바뀔 수 있음
+            this.scheduleRender();
+        });
     }
     
     setupTableSorting() {
@@ -100,8 +129,8 @@ class BasisMonitor {
             this.sortDirection = 'desc';
         }
         
-        // 전체 데이터를 다시 정렬하여 표시
-        this.updateDisplayData();
+        // 정렬 기준이 바뀌었으므로 전체를 한 번 다시 정렬
+        this.updateDisplayData(true);
         
         // 정렬 완료 알림
         this.showToast(`${this.getColumnName(column)} ${this.sortDirection === 'desc' ? '내림차순' : '오름차순'} 정렬`, 'info');
@@ -144,81 +173,114 @@ class BasisMonitor {
     
 
     
-    updateDisplayData() {
-        console.log(`🔄 updateDisplayData 호출: allData=${this.allData?.length}개`);
+    getSortValue(item) {
+        switch (this.sortColumn) {
+            case 'symbol':
+                return item.symbol;
+            case 'spot_volume':
+                return item.spot_volume * item.spot_price;  // USD 거래량
+            case 'futures_volume':
+                return item.futures_volume * item.futures_price;  // USD 거래량
+            default: {
+                const value = parseFloat(item[this.sortColumn]);
+                return isNaN(value) ? -Infinity : value;
+            }
+        }
+    }
+    
+    compareSymbols(a, b) {
+        const aVal = this.sortValues.get(a);
+        const bVal = this.sortValues.get(b);
         
+        // 문자열 비교
+        if (typeof aVal === 'string' && typeof bVal === 'string') {
+            return this.sortDirection === 'desc' ? bVal.localeCompare(aVal) : aVal.localeCompare(bVal);
+        }
+        
+        // 숫자 비교
+        const diff = aVal < bVal ? -1 : aVal > bVal ? 1 : 0;
+        return this.sortDirection === 'desc' ? -diff : diff;
+    }
+    
+    insertionSort(order) {
+        // 거의 정렬된 배열이면 O(n)에 가깝게 끝남, 너무 많이 움직이면 false 반환
+        const maxShifts = order.length * 8;
+        let shifts = 0;
+        for (let i = 1; i < order.length; i++) {
+            const symbol = order[i];
+            let j = i - 1;
+            while (j >= 0 && this.compareSymbols(order[j], symbol) > 0) {
+                order[j + 1] = order[j];
+                j--;
+                if (++shifts > maxShifts) {
+                    order[j + 1] = symbol;
+                    return false;
+                }
+            }
+            order[j + 1] = symbol;
+        }
+        return true;
+    }
+    
+    updateDisplayData(fullSort = false) {
         if (!this.allData || this.allData.length === 0) {
             console.log('❌ allData가 없음');
             return;
         }
         
-        // 전체 데이터를 현재 정렬 기준으로 정렬
-        let sortedData = [...this.allData];
-        sortedData.sort((a, b) => {
-            let aVal, bVal;
-            
-            switch (this.sortColumn) {
-                case 'symbol':
-                    aVal = a.symbol;
-                    bVal = b.symbol;
-                    break;
-                case 'spot_price':
-                    aVal = parseFloat(a.spot_price);
-                    bVal = parseFloat(b.spot_price);
-                    break;
-                case 'futures_price':
-                    aVal = parseFloat(a.futures_price);
-                    bVal = parseFloat(b.futures_price);
-                    break;
-                case 'basis_percent':
-                    aVal = parseFloat(a.basis_percent);
-                    bVal = parseFloat(b.basis_percent);
-                    break;
-                case 'spot_volume':
-                    aVal = parseFloat(a.spot_volume) * parseFloat(a.spot_price);  // USD 거래량
-                    bVal = parseFloat(b.spot_volume) * parseFloat(b.spot_price);
-                    break;
-                case 'futures_volume':
-                    aVal = parseFloat(a.futures_volume) * parseFloat(a.futures_price);  // USD 거래량
-                    bVal = parseFloat(b.futures_volume) * parseFloat(b.futures_price);
-                    break;
-                default:
-                    aVal = a[this.sortColumn];
-                    bVal = b[this.sortColumn];
+        const previous = this.rowsBySymbol;
+        this.rowsBySymbol = new Map();
+        this.sortValues = new Map();
+        for (const item of this.allData) {
+            this.rowsBySymbol.set(item.symbol, item);
+            this.sortValues.set(item.symbol, this.getSortValue(item));  // 정렬 키는 행마다 한 번만 계산
+        }
+        
+        const compare = (a, b) => this.compareSymbols(a, b);
+        if (fullSort || this.sortedSymbols.length === 0) {
+            this.sortedSymbols = [...this.rowsBySymbol.keys()].sort(compare);
+        } else {
+            // 이전 순서에서 사라진 심볼을 빼고 삽입 정렬로 보정한 뒤, 새 심볼만 따로 정렬해서 병합
+            const existing = this.sortedSymbols.filter(symbol => this.rowsBySymbol.has(symbol));
+            if (!this.insertionSort(existing)) {
+                existing.sort(compare);
             }
-            
-            // 문자열 비교
-            if (typeof aVal === 'string' && typeof bVal === 'string') {
-                return this.sortDirection === 'desc' ? bVal.localeCompare(aVal) : aVal.localeCompare(bVal);
+            const added = [];
+            for (const symbol of this.rowsBySymbol.keys()) {
+                if (!previous.has(symbol)) added.push(symbol);
             }
-            
-            // 숫자 비교
-            return this.sortDirection === 'desc' ? bVal - aVal : aVal - bVal;
-        });
-        
-        console.log(`📊 전체 정렬 완료: ${this.sortColumn} ${this.sortDirection} - 1위: ${sortedData[0]?.symbol} (${sortedData[0]?.[this.sortColumn]})`);
-        
-        // 정렬된 결과에서 상위 10개만 선택
-        this.currentData = sortedData.slice(0, this.displayLimit);
-        console.log(`✂️ ${this.displayLimit}개 선택: ${this.currentData.length}개`);
+            this.sortedSymbols = added.length > 0 ? this.mergeSorted(existing, added.sort(compare)) : existing;
+        }
         
-        // 테이블 업데이트
-        this.updateTable(this.currentData);
         this.updateSortIndicators();
-        
-        console.log(`✅ 표시 완료: ${this.currentData.length}개`);
+        this.scheduleRender();
+    }
+    
+    mergeSorted(left, right) {
+        const merged = new Array(left.length + right.length);
+        let i = 0, j = 0, k = 0;
+        while (i < left.length && j < right.length) {
+            merged[k++] = this.compareSymbols(left[i], right[j]) <= 0 ? left[i++] : right[j++];
+        }
+        while (i < left.length) merged[k++] = left[i++];
+        while (j < right.length) merged[k++] = right[j++];
+        return merged;
     }
     
     connectWebSocket() {
         try {
             // WebSocket 프로토콜 결정 (HTTPS면 WSS, HTTP면 WS)
             const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-            const wsUrl = `${protocol}//${window.location.host}/ws`;
+            const wsUrl = `${protocol}//${window.location.host}/ws?format=${this.wireFormat}`;
             
             console.log(`WebSocket 연결 시도: ${wsUrl}`);
             this.updateConnectionStatus('connecting', '연결 중...');
             
             this.ws = new WebSocket(wsUrl);
+            this.ws.binaryType = 'arraybuffer';
+            this.subscribedInterval = null;
+            this.symbolDict = [];
+            this.symbolDictVersion = null;
             
             this.ws.onopen = (event) => {
                 console.log('✅ WebSocket 연결 성공');
@@ -226,10 +288,16 @@ class BasisMonitor {
                 this.reconnectAttempts = 0;
                 this.updateConnectionStatus('connected', '연결됨');
                 this.showToast('실시간 연결이 설정되었습니다', 'success');
+                this.sendSubscription();
             };
             
             this.ws.onmessage = (event) => {
                 try {
+                    if (event.data instanceof ArrayBuffer) {
+                        const data = this.decodeBinaryFrame(event.data);
+                        if (data) this.handleWebSocketMessage(data);
+                        return;
+                    }
                     const data = JSON.parse(event.data);
                     this.handleWebSocketMessage(data);
                 } catch (error) {
@@ -263,6 +331,104 @@ class BasisMonitor {
         }
     }
     
+    sendSubscription() {
+        if (!this.ws || this.ws.readyState !== WebSocket.OPEN) return;
+        
+        let interval = this.updateInterval;
+        if (document.hidden) {
+            interval = this.hiddenInterval;
+        }
+        if (interval === null) {
+            // 서버 기본 주기로 복귀 (요청했던 적이 없으면 보낼 필요 없음)
+            if (!this.subscribedInterval) return;
+            this.ws.send(JSON.stringify({ type: 'unsubscribe' }));
+            this.subscribedInterval = null;
+            console.log('⏱️ 업데이트 주기 요청 해제 (서버 기본 주기)');
+            return;
+        }
+        if (interval === this.subscribedInterval) return;
+        
+        this.ws.send(JSON.stringify({ type: 'subscribe', interval: interval }));
+        this.subscribedInterval = interval;
+        console.log(`⏱️ 업데이트 주기 요청: ${interval}초`);
+    }
+    
+    decodeBinaryFrame(buffer) {
+        // 헤더: u8 version | u8 type | u16 dictVersion | u32 count | f64 timestamp(ms, 스냅샷 계산 시각) (리틀 엔디언)
+        const view = new DataView(buffer);
+        const msgType = view.getUint8(1) & 0x7f;
+        const stale = (view.getUint8(1) & 0x80) !== 0;  // 오래된 스냅샷 (새 스냅샷은 곧 도착)
+        const dictVersion = view.getUint16(2, true);
+        const count = view.getUint32(4, true);
+        const timestamp = view.getFloat64(8, true);
+        let offset = 16;
+        
+        if (msgType === 1) {
+            // 심볼 사전
+            const text = new TextDecoder().decode(new Uint8Array(buffer, offset));
+            this.symbolDict = count > 0 ? text.split('\n') : [];
+            this.symbolDictVersion = dictVersion;
+            return null;
+        }
+        
+        if (dictVersion !== this.symbolDictVersion) {
+            console.warn('심볼 사전 버전 불일치, 프레임 무시:', dictVersion, this.symbolDictVersion);
+            return null;
+        }
+        
+        const spotPrice = new Float64Array(buffer, offset, count); offset += count * 8;
+        const futuresPrice = new Float64Array(buffer, offset, count); offset += count * 8;
+        const spotAsk = new Float64Array(buffer, offset, count); offset += count * 8;
+        const futuresBid = new Float64Array(buffer, offset, count); offset += count * 8;
+        const nextFundingTime = new Float64Array(buffer, offset, count); offset += count * 8;
+        const basis = new Float32Array(buffer, offset, count); offset += count * 4;
+        const basisPercent = new Float32Array(buffer, offset, count); offset += count * 4;
+        const spotVolume = new Float32Array(buffer, offset, count); offset += count * 4;
+        const futuresVolume = new Float32Array(buffer, offset, count); offset += count * 4;
+        const basisZ = new Float32Array(buffer, offset, count); offset += count * 4;
+        const basisEma = new Float32Array(buffer, offset, count); offset += count * 4;
+        const basisEwStd = new Float32Array(buffer, offset, count); offset += count * 4;
+        const execBasisPercent = new Float32Array(buffer, offset, count); offset += count * 4;
+        const fundingRate = new Float32Array(buffer, offset, count); offset += count * 4;
+        const fundingAnnualized = new Float32Array(buffer, offset, count); offset += count * 4;
+        const markIndexBasis = new Float32Array(buffer, offset, count); offset += count * 4;
+        const symbolIndex = new Uint16Array(buffer, offset, count);
+        
+        const lastUpdate = new Date(timestamp).toISOString();
+        const data = new Array(count);
+        for (let i = 0; i < count; i++) {
+            data[i] = {
+                symbol: this.symbolDict[symbolIndex[i]],
+                spot_price: spotPrice[i],
+                futures_price: futuresPrice[i],
+                basis: basis[i],
+                basis_percent: basisPercent[i],
+                spot_volume: spotVolume[i],
+                futures_volume: futuresVolume[i],
+                basis_z: basisZ[i],
+                basis_ema: basisEma[i],
+                basis_ew_std: basisEwStd[i],
+                // NaN(호가 없음)은 JSON 포맷과 같게 null로 변환
+                spot_ask: isNaN(spotAsk[i]) ? null : spotAsk[i],
+                futures_bid: isNaN(futuresBid[i]) ? null : futuresBid[i],
+                exec_basis_percent: isNaN(execBasisPercent[i]) ? null : execBasisPercent[i],
+                funding_rate: isNaN(fundingRate[i]) ? null : fundingRate[i],
+                funding_annualized_percent: isNaN(fundingAnnualized[i]) ? null : fundingAnnualized[i],
+                mark_index_basis_percent: isNaN(markIndexBasis[i]) ? null : markIndexBasis[i],
+                next_funding_time: isNaN(nextFundingTime[i]) ? null : nextFundingTime[i],
+                last_update: lastUpdate
+            };
+        }
+        
+        return {
+            type: msgType === 2 ? 'initial_data' : 'basis_update',
+            timestamp: lastUpdate,
+            stale: stale,
+            data: data,
+            total_count: count
+        };
+    }
+    
     scheduleReconnect() {
         this.reconnectAttempts++;
         const delay = this.reconnectDelay * this.reconnectAttempts;
@@ -293,13 +459,13 @@ class BasisMonitor {
         switch (data.type) {
             case 'initial_data':
                 this.updateBasisData(data);
-                this.updateLastUpdate(data.timestamp);
+                this.updateLastUpdate(data.timestamp, data.stale);
                 // 초기 데이터 로드 시 정렬 표시 설정
                 setTimeout(() => this.updateSortIndicators(), 100);
                 break;
             case 'basis_update':
                 this.updateBasisData(data);
-                this.updateLastUpdate(data.timestamp);
+                this.updateLastUpdate(data.timestamp, data.stale);
                 break;
             default:
                 console.log('알 수 없는 메시지 타입:', data.type);
@@ -336,49 +502,136 @@ class BasisMonitor {
         // 통계 업데이트 (전체 데이터 기준)
         this.updateStats(this.allData);
         
-        console.log(`📊 베이시스 데이터 업데이트 완료: 전체 ${this.allData.length}개 중 ${this.currentMode} 모드로 ${this.currentData.length}개 표시`);
-    }
-    
-    updateTable(basisData) {
-        const tbody = this.elements.basisTableBody;
-        tbody.innerHTML = '';
-        
-        basisData.forEach((item, index) => {
-            const row = document.createElement('tr');
-            row.innerHTML = `
-                <td><span class="rank">${index + 1}</span></td>
-                <td>
-                    <a href="https://www.binance.com/en/futures/${item.symbol}" 
-                       target="_blank" 
-                       rel="noopener noreferrer"
-                       class="symbol-link"
-                       title="바이낸스 ${item.symbol} 선물 거래 페이지로 이동">
-                        <span class="symbol">${item.symbol}</span>
-                        <i class="fas fa-external-link-alt"></i>
-                    </a>
-                </td>
-                <td class="price">$${this.formatNumber(item.spot_price, 4)}</td>
-                <td class="price">$${this.formatNumber(item.futures_price, 4)}</td>
-                <td class="price ${this.getBasisClass(item.basis)}">$${this.formatNumber(item.basis, 4)}</td>
-                <td class="${this.getBasisClass(item.basis_percent)}">${this.formatNumber(item.basis_percent, 2)}%</td>
-                <td class="volume">${this.formatVolumeUSD(item.spot_volume * item.spot_price)}</td>
-                <td class="volume">${this.formatVolumeUSD(item.futures_volume * item.futures_price)}</td>
-            `;
-            
-            // 행 애니메이션
-            row.style.opacity = '0';
-            row.style.transform = 'translateY(10px)';
-            tbody.appendChild(row);
-            
-            // 애니메이션 지연 (더 빠르게)
-            setTimeout(() => {
-                row.style.transition = 'opacity 0.2s ease, transform 0.2s ease';
-                row.style.opacity = '1';
-                row.style.transform = 'translateY(0)';
-            }, index * 20);
+        console.log(`📊 베이시스 데이터 업데이트 완료: 전체 ${this.allData.length}개`);
+    }
+    
+    scheduleRender() {
+        // 한 프레임에 여러 메시지/스크롤 이벤트가 와도 한 번만 그림
+        if (this.renderScheduled) return;
+        this.renderScheduled = true;
+        requestAnimationFrame(() => {
+            this.renderScheduled = false;
+            this.renderVisibleRows();
         });
     }
     
+    ensureTableBody() {
+        // 위/아래 여백 행 사이에 보이는 행만 둠 (showNoData 등으로 tbody가 바뀌었으면 다시 구성)
+        if (this.topSpacer && this.topSpacer.parentNode === this.elements.basisTableBody) return;
+        
+        const createSpacer = () => {
+            const spacer = document.createElement('tr');
+            spacer.className = 'spacer-row';
+            spacer.innerHTML = '<td colspan="8"></td>';
+            return spacer;
+        };
+        this.topSpacer = createSpacer();
+        this.bottomSpacer = createSpacer();
+        this.rowPool = [];
+        this.elements.basisTableBody.replaceChildren(this.topSpacer, this.bottomSpacer);
+    }
+    
+    renderVisibleRows() {
+        const total = this.sortedSymbols.length;
+        if (total === 0) return;
+        this.ensureTableBody();
+        
+        const wrapper = this.elements.tableWrapper;
+        const rowHeight = this.rowHeight || 68;  // 측정 전 추정값
+        const headerHeight = this.elements.basisTable.tHead.offsetHeight;
+        const scrollTop = Math.max(0, wrapper.scrollTop - headerHeight);
+        const viewportRows = Math.ceil((wrapper.clientHeight || window.innerHeight) / rowHeight);
+        
+        // 짝수 행에서 시작해야 스크롤 중에 줄무늬가 뒤바뀌지 않음
+        let start = Math.max(0, Math.floor(scrollTop / rowHeight) - this.overscan);
+        start -= start % 2;
+        const end = Math.min(total, start + viewportRows + this.overscan * 2);
+        const count = end - start;
+        
+        this.topSpacer.style.height = `${start * rowHeight}px`;
+        this.bottomSpacer.style.height = `${(total - end) * rowHeight}px`;
+        
+        // 행은 위치별로 재사용하고, 개수가 달라질 때만 추가/제거
+        while (this.rowPool.length < count) {
+            const row = this.createRow();
+            this.bottomSpacer.before(row.tr);
+            this.rowPool.push(row);
+        }
+        while (this.rowPool.length > count) {
+            this.rowPool.pop().tr.remove();
+        }
+        
+        for (let i = 0; i < count; i++) {
+            const index = start + i;
+            this.patchRow(this.rowPool[i], index, this.rowsBySymbol.get(this.sortedSymbols[index]));
+        }
+        
+        if (!this.rowHeight && count > 0) {
+            this.rowHeight = this.rowPool[0].tr.offsetHeight || rowHeight;
+            if (this.rowHeight !== rowHeight) this.scheduleRender();  // 측정값으로 여백 다시 계산
+        }
+    }
+    
+    createRow() {
+        const tr = document.createElement('tr');
+        tr.innerHTML = `
+            <td><span class="rank"></span></td>
+            <td>
+                <a target="_blank" rel="noopener noreferrer" class="symbol-link">
+                    <span class="symbol"></span>
+                    <i class="fas fa-external-link-alt"></i>
+                </a>
+            </td>
+            <td class="price"></td>
+            <td class="price"></td>
+            <td class="price"></td>
+            <td></td>
+            <td class="volume"></td>
+            <td class="volume"></td>
+        `;
+        return {
+            tr: tr,
+            cells: tr.children,
+            rank: tr.querySelector('.rank'),
+            link: tr.querySelector('.symbol-link'),
+            symbol: tr.querySelector('.symbol'),
+            text: {},     // 셀별 마지막 표시 문자열
+            classes: {}   // 셀별 마지막 클래스
+        };
+    }
+    
+    patchCell(row, key, element, text, className = null) {
+        // 값이 바뀐 셀만 DOM에 씀
+        if (row.text[key] !== text) {
+            element.textContent = text;
+            row.text[key] = text;
+        }
+        if (className !== null && row.classes[key] !== className) {
+            element.className = className;
+            row.classes[key] = className;
+        }
+    }
+    
+    patchRow(row, index, item) {
+        const cells = row.cells;
+        
+        this.patchCell(row, 'rank', row.rank, String(index + 1));
+        if (row.text.symbol !== item.symbol) {
+            row.text.symbol = item.symbol;
+            row.symbol.textContent = item.symbol;
+            row.link.href = `https://www.binance.com/en/futures/${item.symbol}`;
+            row.link.title = `바이낸스 ${item.symbol} 선물 거래 페이지로 이동`;
+        }
+        this.patchCell(row, 'spot_price', cells[2], `$${this.formatNumber(item.spot_price, 4)}`);
+        this.patchCell(row, 'futures_price', cells[3], `$${this.formatNumber(item.futures_price, 4)}`);
+        this.patchCell(row, 'basis', cells[4], `$${this.formatNumber(item.basis, 4)}`,
+            `price ${this.getBasisClass(item.basis)}`);
+        this.patchCell(row, 'basis_percent', cells[5], `${this.formatNumber(item.basis_percent, 2)}%`,
+            this.getBasisClass(item.basis_percent));
+        this.patchCell(row, 'spot_volume', cells[6], this.formatVolumeUSD(item.spot_volume * item.spot_price));
+        this.patchCell(row, 'futures_volume', cells[7], this.formatVolumeUSD(item.futures_volume * item.futures_price));
+    }
+    
     updateStats(basisData) {
         if (basisData.length === 0) return;
         
@@ -395,16 +648,23 @@ class BasisMonitor {
         const totalVolumeUSD = basisData.reduce((sum, item) => 
             sum + (item.spot_volume * item.spot_price) + (item.futures_volume * item.futures_price), 0);
         this.elements.totalVolume.textContent = this.formatVolumeUSD(totalVolumeUSD);
+        
+        // 상위 N개가 아닌 전체 심볼을 스크롤로 표시 (제목 기본값은 Vercel 폴링 스크립트 기준)
+        if (this.elements.rankingScope) {
+            this.elements.rankingScope.textContent = `(전체 ${basisData.length}개)`;
+        }
     }
     
-    updateLastUpdate(timestamp) {
+    updateLastUpdate(timestamp, stale = false) {
+        // timestamp는 서버가 스냅샷을 계산한 시각 (전송 시각 아님)
         const date = new Date(timestamp);
         const timeString = date.toLocaleTimeString('ko-KR', {
             hour: '2-digit',
             minute: '2-digit',
             second: '2-digit'
         });
-        this.elements.lastUpdate.textContent = `마지막 업데이트: ${timeString}`;
+        const suffix = stale ? ' (이전 데이터, 갱신 중...)' : '';
+        this.elements.lastUpdate.textContent = `마지막 업데이트: ${timeString}${suffix}`;
     }
     
     showNoData() {
@@ -428,10 +688,15 @@ class BasisMonitor {
     
     formatNumber(num, decimals = 2) {
         if (typeof num !== 'number' || isNaN(num)) return '0.00';
-        return num.toLocaleString('ko-KR', {
-            minimumFractionDigits: decimals,
-            maximumFractionDigits: decimals
-        });
+        // toLocaleString은 호출마다 포맷터를 새로 만드므로 자릿수별로 캐시
+        let format = this.numberFormats[decimals];
+        if (!format) {
+            format = this.numberFormats[decimals] = new Intl.NumberFormat('ko-KR', {
+                minimumFractionDigits: decimals,
+                maximumFractionDigits: decimals
+            });
+        }
+        return format.format(num);
     }
     
     formatVolume(volume) {
@@ -0,0 +1,135 @@
+"""
+RollingBasisStats 슬라이딩 Welford 갱신과 지수가중 평균/분산을 전수 계산과 비교
+"""
+
+import math
+import os
+import random
+import statistics
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rolling_stats import RollingBasisStats  # noqa: E402
+
+INTERVAL = 10.0
+
+def brute_force_z(history, window):
+    """마지막 window개 값으로 직접 계산한 z-score"""
+    recent = history[-window:]
+    if len(recent) < 2:
+        return 0.0
+    stdev = statistics.stdev(recent)
+    if stdev == 0:
+        return 0.0
+    return (recent[-1] - statistics.fmean(recent)) / stdev
+
+@pytest.mark.parametrize("window", [1, 2, 5, 50])
+def test_z_score_matches_brute_force(window):
+    rng = random.Random(window)
+    stats = RollingBasisStats(window=window, ema_span=10, sample_interval=INTERVAL)
+    history = []
+    for i in range(window * 20):
+        value = rng.gauss(0.05, 0.2)
+        history.append(value)
+        z_score, _, _ = stats.update("BTCUSDT", value, now=i * INTERVAL)
+        assert z_score == pytest.approx(brute_force_z(history, window), rel=1e-6, abs=1e-9)
+
+def test_ema_matches_recursive_definition():
+    stats = RollingBasisStats(window=10, ema_span=9, sample_interval=INTERVAL)
+    alpha = 2.0 / 10
+    values = [0.1, 0.4, -0.2, 0.3, 0.0, 0.25]
+    expected = None
+    for i, value in enumerate(values):
+        expected = value if expected is None else expected + alpha * (value - expected)
+        _, ema, _ = stats.update("ETHUSDT", value, now=i * INTERVAL)
+        assert ema == pytest.approx(expected)
+
+def test_ew_variance_matches_weighted_definition():
+    # 가중치 (1 - alpha)^k로 직접 계산한 지수가중 분산 (첫 값은 남은 가중치 전부)
+    stats = RollingBasisStats(window=10, ema_span=9, sample_interval=INTERVAL)
+    alpha = 2.0 / 10
+    values = [0.1, 0.4, -0.2, 0.3, 0.0, 0.25]
+    for n, value in enumerate(values):
+        _, ema, ew_std = stats.update("ETHUSDT", value, now=n * INTERVAL)
+        weights = [alpha * (1 - alpha) ** (n - i) for i in range(1, n + 1)]
+        weights.insert(0, (1 - alpha) ** n)
+        mean = sum(w * v for w, v in zip(weights, values))
+        variance = sum(w * (v - mean) ** 2 for w, v in zip(weights, values))
+        assert ema == pytest.approx(mean)
+        assert ew_std == pytest.approx(math.sqrt(variance), abs=1e-12)
+
+def test_fast_ticks_do_not_shrink_window():
+    # 2초 틱이 10초 틱보다 윈도우를 빨리 소모하면 안 됨
+    slow = RollingBasisStats(window=30, sample_interval=INTERVAL)
+    fast = RollingBasisStats(window=30, sample_interval=INTERVAL)
+    rng = random.Random(7)
+    series = [rng.gauss(0, 1) for _ in range(400)]   # 2초마다 한 값
+    for i, value in enumerate(series):
+        z_fast, _, _ = fast.update("BTCUSDT", value, now=i * 2.0)
+        if i % 5 == 0:
+            z_slow, _, _ = slow.update("BTCUSDT", value, now=i * 2.0)
+            assert z_fast == pytest.approx(z_slow)
+
+def test_slow_ticks_fill_skipped_slots_with_previous_value():
+    stats = RollingBasisStats(window=10, sample_interval=INTERVAL)
+    stats.update("BTCUSDT", 1.0, now=0.0)
+    z_score, _, _ = stats.update("BTCUSDT", 2.0, now=3 * INTERVAL)
+    # 윈도우: 1.0, 1.0, 1.0, 2.0
+    assert z_score == pytest.approx(brute_force_z([1.0, 1.0, 1.0, 2.0], 10))
+
+def test_ema_weight_depends_on_elapsed_time_only():
+    one_step = RollingBasisStats(sample_interval=INTERVAL)
+    two_steps = RollingBasisStats(sample_interval=INTERVAL)
+    one_step.update("BTCUSDT", 0.0, now=0.0)
+    two_steps.update("BTCUSDT", 0.0, now=0.0)
+    _, ema_one, _ = one_step.update("BTCUSDT", 1.0, now=INTERVAL)
+    two_steps.update("BTCUSDT", 1.0, now=INTERVAL / 2)
+    _, ema_two, _ = two_steps.update("BTCUSDT", 1.0, now=INTERVAL)
+    assert ema_one == pytest.approx(ema_two)
+
+def test_gap_longer_than_window_resets_state():
+    stats = RollingBasisStats(window=5, sample_interval=INTERVAL)
+    for i in range(5):
+        stats.update("BTCUSDT", float(i), now=i * INTERVAL)
+    z_score, ema, _ = stats.update("BTCUSDT", 9.0, now=100 * INTERVAL)
+    assert z_score == 0.0
+    assert ema == 9.0
+
+def test_symbols_are_independent():
+    stats = RollingBasisStats(window=3, sample_interval=INTERVAL)
+    for i, value in enumerate((1.0, 2.0, 3.0)):
+        stats.update("BTCUSDT", value, now=i * INTERVAL)
+    z_score, ema, _ = stats.update("ETHUSDT", 5.0, now=3 * INTERVAL)
+    assert z_score == 0.0
+    assert ema == 5.0
+
+def test_constant_series_has_zero_z_score():
+    stats = RollingBasisStats(window=4, sample_interval=INTERVAL)
+    for i in range(10):
+        z_score, _, _ = stats.update("BTCUSDT", 0.12, now=i * INTERVAL)
+    assert z_score == 0.0
+
+def test_slowest_tick_interval_keeps_window():
+    # 최대 틱 주기(지연 포함)로 들어오는 값은 빈 슬롯을 채우며 이어서 누적
+    stats = RollingBasisStats(window=50, sample_interval=INTERVAL, max_gap=60.0)
+    history = []
+    for i, value in enumerate((1.0, 3.0, 2.0, 5.0)):
+        z_score, _, _ = stats.update("BTCUSDT", value, now=i * 61.0)
+        history.extend([history[-1]] * 5 + [value] if history else [value])
+        assert z_score == pytest.approx(brute_force_z(history, 50))
+
+def test_resume_after_suspension_starts_new_window():
+    # 틱 중단(50분) 후 재개 시 중단 구간을 직전 값으로 채우지 않음
+    stats = RollingBasisStats(window=360, sample_interval=INTERVAL, max_gap=60.0)
+    fresh = RollingBasisStats(window=360, sample_interval=INTERVAL, max_gap=60.0)
+    rng = random.Random(3)
+    for i in range(30):
+        stats.update("BTCUSDT", rng.gauss(0.05, 0.01), now=i * INTERVAL)
+    resumed_at = 29 * INTERVAL + 3000.0
+    for i, value in enumerate((0.05, 0.07, 0.06, 0.08)):
+        now = resumed_at + i * INTERVAL
+        assert stats.update("BTCUSDT", value, now=now) == pytest.approx(fresh.update("BTCUSDT", value, now=now))
+    assert stats._symbols["BTCUSDT"].count == 4
@@ -0,0 +1,185 @@
+"""
+RefreshScheduler 중단/재개, 단일 갱신 공유, stale-while-revalidate, 오류 대기 검증
+(가짜 tick과 ws_interval로 실제 시간을 짧게 사용)
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import RefreshScheduler  # noqa: E402
+
+class FakeTick:
+    """호출 횟수를 세고, gate가 열릴 때까지 기다리는 가짜 틱"""
+
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("tick failed")
+        return self.calls
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, timeout=5))
+
+async def stop(task: asyncio.Task):
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+def test_suspends_without_consumers_and_resumes_on_notify():
+    async def scenario():
+        tick = FakeTick()
+        interval = None
+        scheduler = RefreshScheduler(tick, lambda: interval)
+        loop = asyncio.ensure_future(scheduler.run())
+        await asyncio.sleep(0.05)
+        assert tick.calls == 0
+        assert scheduler.current_interval is None
+
+        # 구독자가 생기면 notify로 즉시 깨어나 틱
+        interval = 0.05
+        scheduler.notify()
+        await asyncio.sleep(0.01)
+        assert tick.calls == 1
+        assert scheduler.current_interval == 0.05
+
+        # 구독자가 모두 떠나면 다시 중단
+        await asyncio.sleep(0.12)
+        interval = None
+        scheduler.notify()
+        await asyncio.sleep(0.01)
+        calls = tick.calls
+        await asyncio.sleep(0.1)
+        assert tick.calls == calls
+        assert scheduler.current_interval is None
+        await stop(loop)
+
+    run(scenario())
+
+def test_notify_picks_up_faster_interval_without_waiting():
+    async def scenario():
+        tick = FakeTick()
+        interval = 10.0
+        scheduler = RefreshScheduler(tick, lambda: interval)
+        loop = asyncio.ensure_future(scheduler.run())
+        await asyncio.sleep(0.01)
+        assert tick.calls == 1
+
+        # 10초 대기 중이어도 주기가 짧아지면 새 주기로 다시 계산
+        interval = 0.05
+        scheduler.notify()
+        await asyncio.sleep(0.08)
+        assert tick.calls == 2
+        await stop(loop)
+
+    run(scenario())
+
+def test_concurrent_refreshes_share_one_tick():
+    async def scenario():
+        tick = FakeTick()
+        tick.gate.clear()
+        scheduler = RefreshScheduler(tick, lambda: None)
+        first = asyncio.ensure_future(scheduler.refresh())
+        second = asyncio.ensure_future(scheduler.refresh())
+        await asyncio.sleep(0.01)
+        tick.gate.set()
+        assert await asyncio.gather(first, second) == [1, 1]
+        assert tick.calls == 1
+
+    run(scenario())
+
+def test_cancelled_waiter_does_not_cancel_shared_refresh():
+    async def scenario():
+        tick = FakeTick()
+        tick.gate.clear()
+        scheduler = RefreshScheduler(tick, lambda: None)
+        waiter = asyncio.ensure_future(scheduler.refresh())
+        await asyncio.sleep(0.01)
+        await stop(waiter)
+
+        tick.gate.set()
+        assert await scheduler.refresh() == 1
+        assert scheduler.snapshot == 1
+        assert tick.calls == 1
+
+    run(scenario())
+
+def test_first_rest_call_waits_then_serves_stale_snapshot_while_refreshing():
+    async def scenario():
+        tick = FakeTick()
+        scheduler = RefreshScheduler(tick, lambda: None, rest_interval=0.05)
+        assert await scheduler.get_snapshot() == (1, False)
+
+        # 주기 안에서는 갱신 없이 같은 스냅샷
+        assert await scheduler.get_snapshot() == (1, False)
+        assert tick.calls == 1
+
+        # 오래된 스냅샷은 바로 반환하고 뒤에서 갱신 (갱신 중 요청은 같은 갱신 공유)
+        await asyncio.sleep(0.06)
+        tick.gate.clear()
+        assert await scheduler.get_snapshot() == (1, True)
+        assert await scheduler.get_snapshot() == (1, True)
+        await asyncio.sleep(0.01)
+        assert tick.calls == 2
+
+        tick.gate.set()
+        await asyncio.sleep(0.01)
+        assert await scheduler.get_snapshot() == (2, False)
+
+    run(scenario())
+
+def test_rest_demand_expires_after_idle_timeout():
+    async def scenario():
+        tick = FakeTick()
+        scheduler = RefreshScheduler(tick, lambda: None, rest_interval=0.02, rest_idle_timeout=0.1)
+        loop = asyncio.ensure_future(scheduler.run())
+        await asyncio.sleep(0.01)
+        assert tick.calls == 0
+
+        # 중단 상태에서의 REST 호출이 루프를 깨움
+        await scheduler.get_snapshot()
+        await asyncio.sleep(0.05)
+        assert scheduler.current_interval == 0.02
+        assert tick.calls >= 2
+
+        await asyncio.sleep(0.1)
+        calls = tick.calls
+        await asyncio.sleep(0.06)
+        assert tick.calls == calls
+        assert scheduler.current_interval is None
+        await stop(loop)
+
+    run(scenario())
+
+def test_failed_tick_backs_off_and_keeps_previous_snapshot():
+    async def scenario():
+        tick = FakeTick()
+        scheduler = RefreshScheduler(tick, lambda: 0.01, error_backoff=0.1)
+        await scheduler.refresh()
+
+        tick.fail = True
+        await asyncio.sleep(0.02)
+        loop = asyncio.ensure_future(scheduler.run())
+        await asyncio.sleep(0.05)
+        # 실패 직후 틱 주기(0.01초)가 아닌 error_backoff 동안 재시도하지 않음
+        assert tick.calls == 2
+        assert scheduler.snapshot == 1
+
+        tick.fail = False
+        await asyncio.sleep(0.1)
+        assert tick.calls >= 3
+        assert scheduler.snapshot == tick.calls
+        await stop(loop)
+
+    run(scenario())
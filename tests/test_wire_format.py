@@ -0,0 +1,185 @@
+"""
+바이너리 프레임 레이아웃 고정 (static/script.js decodeBinaryFrame과 같은 순서/오프셋)
+"""
+
+import math
+import os
+import re
+import struct
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wire_format  # noqa: E402
+from binance_api import TickerData  # noqa: E402
+from wire_format import (  # noqa: E402
+    FLAG_STALE,
+    MSG_BASIS_UPDATE,
+    MSG_INITIAL_DATA,
+    MSG_SYMBOL_DICT,
+    WIRE_VERSION,
+    SymbolDictionary,
+    encode_basis_frame,
+)
+
+# 디코더가 읽는 컬럼 순서 (이름, struct 코드)
+COLUMNS = [
+    ("spot_price", "d"),
+    ("futures_price", "d"),
+    ("spot_ask", "d"),
+    ("futures_bid", "d"),
+    ("next_funding_time", "d"),
+    ("basis", "f"),
+    ("basis_percent", "f"),
+    ("spot_volume", "f"),
+    ("futures_volume", "f"),
+    ("basis_z", "f"),
+    ("basis_ema", "f"),
+    ("basis_ew_std", "f"),
+    ("exec_basis_percent", "f"),
+    ("funding_rate", "f"),
+    ("funding_annualized_percent", "f"),
+    ("mark_index_basis_percent", "f"),
+]
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "script.js")
+
+UPDATED_AT = datetime(2026, 1, 2, 3, 4, 5, 678000)
+
+def make_ticker(symbol, seed, **overrides):
+    fields = dict(
+        symbol=symbol,
+        spot_price=100.0 + seed,
+        futures_price=100.5 + seed,
+        basis=0.5,
+        basis_percent=0.5 / (100.0 + seed) * 100,
+        spot_volume=1000.0 * (seed + 1),
+        futures_volume=2000.0 * (seed + 1),
+        last_update=UPDATED_AT,
+        basis_z=0.25 * seed,
+        basis_ema=0.4,
+        basis_ew_std=0.05,
+        spot_ask=100.1 + seed,
+        futures_bid=100.4 + seed,
+        exec_basis_percent=0.3,
+        funding_rate=0.0001,
+        funding_annualized_percent=10.95,
+        mark_index_basis_percent=0.01,
+        next_funding_time=1767330000000.0,
+    )
+    fields.update(overrides)
+    return TickerData(**fields)
+
+def decode(frame):
+    """struct로 헤더와 컬럼을 직접 풀어서 반환"""
+    version, msg_type, dict_version, count, timestamp = struct.unpack_from("<BBHId", frame, 0)
+    offset = 16
+    columns = {}
+    for name, code in COLUMNS:
+        assert offset % struct.calcsize(code) == 0  # 타입 크기 정렬 (JS TypedArray 요구사항)
+        columns[name] = struct.unpack_from(f"<{count}{code}", frame, offset)
+        offset += count * struct.calcsize(code)
+    columns["symbol_index"] = struct.unpack_from(f"<{count}H", frame, offset)
+    offset += count * 2
+    assert offset == len(frame)
+    return (version, msg_type, dict_version, count, timestamp), columns
+
+def f32(value):
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+def test_header_and_columns_round_trip():
+    tickers = [make_ticker("BTCUSDT", 0), make_ticker("ETHUSDT", 1), make_ticker("SOLUSDT", 2)]
+    dictionary = SymbolDictionary()
+    frame = encode_basis_frame(tickers, dictionary, MSG_INITIAL_DATA)
+    (version, msg_type, dict_version, count, timestamp), columns = decode(frame)
+
+    assert version == WIRE_VERSION
+    assert msg_type == MSG_INITIAL_DATA
+    assert dict_version == dictionary.version == 1
+    assert count == 3
+    # 헤더 시각은 인코딩 시각이 아닌 스냅샷 계산 시각
+    assert timestamp == pytest.approx(UPDATED_AT.timestamp() * 1000)
+
+    for name, code in COLUMNS:
+        expected = [getattr(ticker, name) for ticker in tickers]
+        if code == "f":
+            expected = [f32(value) for value in expected]
+        assert list(columns[name]) == expected, name
+    assert [dictionary.symbols[i] for i in columns["symbol_index"]] == ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+
+def test_missing_values_pass_through_as_nan():
+    ticker = make_ticker("BTCUSDT", 0, spot_ask=math.nan, futures_bid=math.nan, exec_basis_percent=math.nan,
+                         funding_rate=math.nan, next_funding_time=math.nan)
+    _, columns = decode(encode_basis_frame([ticker], SymbolDictionary()))
+    for name in ("spot_ask", "futures_bid", "exec_basis_percent", "funding_rate", "next_funding_time"):
+        assert math.isnan(columns[name][0]), name
+
+def test_stale_flag_uses_high_bit_of_message_type():
+    dictionary = SymbolDictionary()
+    tickers = [make_ticker("BTCUSDT", 0)]
+    (_, msg_type, *_), _ = decode(encode_basis_frame(tickers, dictionary, MSG_INITIAL_DATA, stale=True))
+    assert msg_type & FLAG_STALE
+    assert msg_type & 0x7F == MSG_INITIAL_DATA
+    (_, msg_type, *_), _ = decode(encode_basis_frame(tickers, dictionary, MSG_BASIS_UPDATE))
+    assert msg_type == MSG_BASIS_UPDATE
+
+def test_symbol_dictionary_frame():
+    dictionary = SymbolDictionary()
+    encode_basis_frame([make_ticker("BTCUSDT", 0), make_ticker("ETHUSDT", 1)], dictionary)
+    frame = dictionary.encode()
+    version, msg_type, dict_version, count, _ = struct.unpack_from("<BBHId", frame, 0)
+    assert (version, msg_type, dict_version, count) == (WIRE_VERSION, MSG_SYMBOL_DICT, 1, 2)
+    assert frame[16:].decode("utf-8").split("\n") == ["BTCUSDT", "ETHUSDT"]
+
+def test_dictionary_version_bumps_only_for_new_symbols():
+    dictionary = SymbolDictionary()
+    encode_basis_frame([make_ticker("BTCUSDT", 0)], dictionary)
+    first = dictionary.encode()
+    assert dictionary.version == 1
+
+    # 같은 심볼(순서만 바뀜)이면 버전과 캐시된 사전 프레임 유지
+    encode_basis_frame([make_ticker("BTCUSDT", 0)], dictionary)
+    assert dictionary.version == 1
+    assert dictionary.encode() is first
+
+    (_, _, dict_version, _, _), columns = decode(
+        encode_basis_frame([make_ticker("ETHUSDT", 1), make_ticker("BTCUSDT", 0)], dictionary))
+    assert dict_version == dictionary.version == 2
+    assert list(columns["symbol_index"]) == [1, 0]
+    assert dictionary.encode() is not first
+
+def test_dictionary_resets_when_full(monkeypatch):
+    monkeypatch.setattr(wire_format, "MAX_SYMBOLS", 3)
+    dictionary = SymbolDictionary()
+    encode_basis_frame([make_ticker(symbol, i) for i, symbol in enumerate(("A", "B", "C"))], dictionary)
+    assert dictionary.version == 1
+
+    # 한도를 넘으면 현재 프레임의 심볼로만 사전을 다시 구성하고 인덱스도 새로 매김
+    (_, _, dict_version, _, _), columns = decode(
+        encode_basis_frame([make_ticker("C", 0), make_ticker("D", 1)], dictionary))
+    assert dict_version == dictionary.version == 2
+    assert dictionary.symbols == ["C", "D"]
+    assert list(columns["symbol_index"]) == [0, 1]
+
+def test_dictionary_version_wraps_at_u16():
+    dictionary = SymbolDictionary()
+    dictionary.version = 0xFFFF
+    frame = encode_basis_frame([make_ticker("BTCUSDT", 0)], dictionary)
+    assert struct.unpack_from("<H", frame, 2)[0] == dictionary.version == 0
+
+def test_js_decoder_reads_columns_in_the_same_order():
+    with open(SCRIPT_PATH, encoding="utf-8") as f:
+        script = f.read()
+    body = script[script.index("decodeBinaryFrame(buffer) {"):]
+    arrays = re.findall(r"const (\w+) = new (Float64|Float32|Uint16)Array\(buffer, offset, count\)", body)
+    codes = {"Float64": "d", "Float32": "f", "Uint16": "H"}
+    expected = [(name, code) for name, code in COLUMNS] + [("symbol_index", "H")]
+    assert len(arrays) == len(expected)
+    for (js_name, js_type), (name, code) in zip(arrays, expected):
+        assert codes[js_type] == code, (js_name, name)
+        # JS 변수명(camelCase)은 컬럼 이름의 앞부분 (fundingAnnualized ↔ funding_annualized_percent 등)
+        snake = re.sub(r"([A-Z])", lambda m: "_" + m.group(1).lower(), js_name)
+        assert name == snake or name.startswith(snake + "_"), (js_name, name)
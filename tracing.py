@@ -0,0 +1,153 @@
+"""
+틱 단위 트레이스 타임라인
+스케줄러 틱 한 번을 span 트리(단조 시계 기준)로 기록하고 최근 N개를 보관
+
+span()은 contextvars로 현재 부모를 찾으므로 asyncio.gather로 만든 태스크 안에서도
+인자 전달 없이 중첩되며, 활성 트레이스가 없으면 아무 일도 하지 않음
+"""
+
+import collections
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class Span:
+    """트레이스 구간 (시작/종료는 time.perf_counter 기준)"""
+
+    __slots__ = ("name", "start", "end", "attrs", "children")
+
+    def __init__(self, name: str, attrs: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attrs = attrs or {}
+        self.children: List["Span"] = []
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def to_dict(self, origin: float) -> dict:
+        return {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "attrs": self.attrs,
+            "children": [child.to_dict(origin) for child in self.children],
+        }
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+@contextmanager
+def span(name: str, **attrs):
+    """현재 span 아래에 하위 span 기록 (활성 트레이스가 없으면 no-op)"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, attrs)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.attrs["error"] = repr(e)
+        raise
+    finally:
+        child.end = time.perf_counter()
+        _current_span.reset(token)
+
+class StackSampler:
+    """틱 동안 이벤트 루프 스레드의 스택을 주기적으로 샘플링하는 간이 프로파일러"""
+
+    def __init__(self, interval: float, thread_id: int, depth: int = 6):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.depth = depth
+        self.samples: collections.Counter = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tick-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < self.depth:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{frame.f_lineno}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, top: int = 20) -> List[dict]:
+        """샘플링 중지 후 상위 스택 반환"""
+        self._stop.set()
+        self._thread.join()
+        return [{"stack": stack, "samples": count} for stack, count in self.samples.most_common(top)]
+
+class TickTracer:
+    """최근 틱 트레이스 보관소 (느린 틱 로그, 선택적 샘플링 프로파일러 포함)"""
+
+    def __init__(self, capacity: int = 100, slow_threshold: float = 0.0, profile_interval: float = 0.0):
+        self.ticks: Deque[dict] = collections.deque(maxlen=capacity)
+        self.slow_threshold = slow_threshold      # 초, 0이면 느린 틱 로그 안 함
+        self.profile_interval = profile_interval  # 초, 0이면 프로파일러 사용 안 함
+        self.sequence = 0
+
+    @contextmanager
+    def tick(self, name: str = "tick", **attrs):
+        """틱 하나를 루트 span으로 기록"""
+        self.sequence += 1
+        root = Span(name, attrs)
+        started_at = datetime.now()
+        sampler = None
+        if self.profile_interval > 0:
+            sampler = StackSampler(self.profile_interval, threading.get_ident())
+            sampler.start()
+        token = _current_span.set(root)
+        try:
+            yield root
+        except BaseException as e:
+            root.attrs["error"] = repr(e)
+            raise
+        finally:
+            root.end = time.perf_counter()
+            _current_span.reset(token)
+            trace = {
+                "tick": self.sequence,
+                "started_at": started_at.isoformat(),
+                "duration_ms": round(root.duration * 1000, 3),
+                "spans": root.to_dict(root.start),
+            }
+            if sampler is not None:
+                trace["profile"] = sampler.stop()
+            self.ticks.append(trace)
+            if self.slow_threshold and root.duration > self.slow_threshold:
+                logger.warning(f"느린 틱 #{self.sequence}: {trace['duration_ms']:.1f}ms ({summarize(root)})")
+
+    def recent(self, limit: Optional[int] = None) -> List[dict]:
+        """최근 틱 트레이스 (최신순)"""
+        if limit is not None and limit < 0:
+            raise ValueError(f"limit은 0 이상이어야 함: {limit}")
+        ticks = list(reversed(self.ticks))
+        return ticks[:limit] if limit is not None else ticks
+
+def summarize(root: Span) -> str:
+    """하위 span별 소요 시간 한 줄 요약"""
+    parts = []
+    for child in root.children:
+        parts.append(f"{child.name}={child.duration * 1000:.1f}ms")
+        for grandchild in child.children:
+            parts.append(f"{child.name}/{grandchild.name}={grandchild.duration * 1000:.1f}ms")
+    return ", ".join(parts)
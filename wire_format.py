@@ -0,0 +1,126 @@
+"""
+/ws 바이너리 컴팩트 프레임 인코더
+심볼 사전은 한 번만 전송하고, 틱마다 float32/float64 컬럼을 패킹해서 전송
+
+프레임 레이아웃 (리틀 엔디언, 모든 컬럼은 타입 크기에 맞게 정렬됨)
+
+    헤더 16바이트: u8 version | u8 msg_type | u16 dict_version | u32 count | f64 timestamp(ms)
+        msg_type: 하위 7비트가 메시지 종류, 최상위 비트(FLAG_STALE)는 오래된 스냅샷 표시
+                  (중단됐던 스케줄러가 새 스냅샷을 계산하는 동안 보내는 초기 데이터)
+        timestamp: 데이터 프레임은 스냅샷 계산 시각 (JSON 포맷의 행별 last_update와 같은 값),
+                   사전 프레임은 인코딩 시각
+
+    MSG_SYMBOL_DICT: 헤더 뒤에 UTF-8 심볼 목록('\\n' 구분), count = 심볼 수
+    MSG_INITIAL_DATA / MSG_BASIS_UPDATE: 헤더 뒤에 count개 행의 컬럼
+        f64 spot_price[count]
+        f64 futures_price[count]
+        f64 spot_ask[count]       (호가 없으면 NaN)
+        f64 futures_bid[count]    (호가 없으면 NaN)
+        f64 next_funding_time[count] (epoch ms, 펀딩 정보 없으면 NaN)
+        f32 basis[count]
+        f32 basis_percent[count]
+        f32 spot_volume[count]
+        f32 futures_volume[count]
+        f32 basis_z[count]
+        f32 basis_ema[count]
+        f32 basis_ew_std[count]
+        f32 exec_basis_percent[count]
+        f32 funding_rate[count]
+        f32 funding_annualized_percent[count]
+        f32 mark_index_basis_percent[count]
+        u16 symbol_index[count]   (심볼 사전 인덱스)
+"""
+
+import struct
+import time
+from typing import Dict, List, Optional
+
+from binance_api import TickerData
+
+WIRE_VERSION = 3
+
+MSG_SYMBOL_DICT = 1
+MSG_INITIAL_DATA = 2
+MSG_BASIS_UPDATE = 3
+
+FLAG_STALE = 0x80
+
+HEADER = struct.Struct("<BBHId")
+
+# u16 인덱스로 표현 가능한 최대 심볼 수
+MAX_SYMBOLS = 0xFFFF
+
+class SymbolDictionary:
+    """심볼 ↔ 인덱스 사전 (추가 전용, 변경 시 버전 증가)"""
+
+    def __init__(self):
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.version = 0
+        self._encoded: Optional[bytes] = None
+
+    def indices_for(self, symbols: List[str]) -> List[int]:
+        """심볼 목록을 인덱스로 변환 (새 심볼은 사전에 추가)"""
+        missing = [symbol for symbol in symbols if symbol not in self.index]
+        if missing:
+            if len(self.symbols) + len(missing) > MAX_SYMBOLS:
+                # 상장폐지 심볼이 쌓여 한도를 넘으면 사전을 새로 구성
+                self.symbols = []
+                self.index = {}
+                missing = list(dict.fromkeys(symbols))
+            for symbol in missing:
+                if symbol not in self.index:
+                    self.index[symbol] = len(self.symbols)
+                    self.symbols.append(symbol)
+            self.version = (self.version + 1) & 0xFFFF
+            self._encoded = None
+        return [self.index[symbol] for symbol in symbols]
+
+    def encode(self) -> bytes:
+        """심볼 사전 프레임 인코딩 (버전이 바뀔 때까지 캐시)"""
+        if self._encoded is None:
+            body = "\n".join(self.symbols).encode("utf-8")
+            header = HEADER.pack(WIRE_VERSION, MSG_SYMBOL_DICT, self.version,
+                                 len(self.symbols), time.time() * 1000)
+            self._encoded = header + body
+        return self._encoded
+
+def snapshot_time_ms(tickers: List[TickerData]) -> float:
+    """스냅샷 계산 시각 (epoch ms, 한 스냅샷의 행은 모두 같은 last_update를 가짐)"""
+    if not tickers:
+        return time.time() * 1000
+    return tickers[0].last_update.timestamp() * 1000
+
+def encode_basis_frame(tickers: List[TickerData], dictionary: SymbolDictionary,
+                       msg_type: int = MSG_BASIS_UPDATE, stale: bool = False) -> bytes:
+    """베이시스 스냅샷을 컬럼형 바이너리 프레임으로 인코딩
+
+    사전에 없는 심볼은 먼저 추가되므로, 호출 후 dictionary.version이 바뀌었다면
+    이 프레임보다 사전 프레임을 먼저 보내야 함
+    """
+    count = len(tickers)
+    indices = dictionary.indices_for([ticker.symbol for ticker in tickers])
+    header = HEADER.pack(WIRE_VERSION, msg_type | (FLAG_STALE if stale else 0), dictionary.version,
+                         count, snapshot_time_ms(tickers))
+    f64 = struct.Struct(f"<{count}d")
+    f32 = struct.Struct(f"<{count}f")
+    return b"".join((
+        header,
+        f64.pack(*[ticker.spot_price for ticker in tickers]),
+        f64.pack(*[ticker.futures_price for ticker in tickers]),
+        f64.pack(*[ticker.spot_ask for ticker in tickers]),
+        f64.pack(*[ticker.futures_bid for ticker in tickers]),
+        f64.pack(*[ticker.next_funding_time for ticker in tickers]),
+        f32.pack(*[ticker.basis for ticker in tickers]),
+        f32.pack(*[ticker.basis_percent for ticker in tickers]),
+        f32.pack(*[ticker.spot_volume for ticker in tickers]),
+        f32.pack(*[ticker.futures_volume for ticker in tickers]),
+        f32.pack(*[ticker.basis_z for ticker in tickers]),
+        f32.pack(*[ticker.basis_ema for ticker in tickers]),
+        f32.pack(*[ticker.basis_ew_std for ticker in tickers]),
+        f32.pack(*[ticker.exec_basis_percent for ticker in tickers]),
+        f32.pack(*[ticker.funding_rate for ticker in tickers]),
+        f32.pack(*[ticker.funding_annualized_percent for ticker in tickers]),
+        f32.pack(*[ticker.mark_index_basis_percent for ticker in tickers]),
+        struct.pack(f"<{count}H", *indices),
+    ))